@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:14
+
+import datetime
+import json
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_history(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Project = apps.get_model('task_traker', 'Project')
+    ProjectHistory = apps.get_model('accounts', 'ProjectHistory')
+    projects = {}
+    for pk, title in Project.objects.order_by('-id').values_list('id', 'title'):
+        projects[title] = pk
+    joined_at = datetime.datetime.today()
+    for user_id, history in CustomUser.objects.values_list('id', 'history').iterator():
+        titles = json.loads(history) if isinstance(history, str) else history or []
+        entries = []
+        seen = set()
+        for title in titles:
+            key = projects.get(title, title)
+            if key not in seen:
+                seen.add(key)
+                entries.append(
+                    ProjectHistory(user_id=user_id, project_id=projects.get(title), title=title, joined_at=joined_at)
+                )
+        ProjectHistory.objects.bulk_create(entries)
+
+
+def restore_history(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    ProjectHistory = apps.get_model('accounts', 'ProjectHistory')
+    for user in CustomUser.objects.iterator():
+        user.history = json.dumps(
+            list(ProjectHistory.objects.filter(user_id=user.id).order_by('joined_at', 'id').values_list('title', flat=True))
+        )
+        user.save(update_fields=['history'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('task_traker', '0004_outgoingmail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('joined_at', models.DateTimeField(default=datetime.datetime.today)),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='task_traker.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['joined_at', 'id'],
+                'indexes': [models.Index(fields=['user', 'joined_at', 'id'], name='project_history_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='project_history_user_project_unique')],
+            },
+        ),
+        migrations.RunPython(copy_history, restore_history),
+        migrations.RemoveField(
+            model_name='customuser',
+            name='history',
+        ),
+    ]
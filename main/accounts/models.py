@@ -1,3 +1,5 @@
+import datetime
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -18,7 +20,6 @@ class CustomUser(AbstractUser):
         default='profile.png',
     )
 
-    history = models.JSONField(default=deafult_history)
     REQUIRED_FIELDS = [
         'first_name',
         'last_name',
@@ -26,3 +27,34 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return f'{self.username}'
+
+
+class ProjectHistory(models.Model):
+    """
+    Запись истории проектов пользователя: в какой проект и когда его включили. Записи только добавляются.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='project_history',
+    )
+    project = models.ForeignKey(
+        'task_traker.Project',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+    )
+    title = models.CharField(max_length=100)
+    joined_at = models.DateTimeField(default=datetime.datetime.today)
+
+    class Meta:
+        ordering = ['joined_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='project_history_user_project_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'joined_at', 'id'], name='project_history_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.title}'
@@ -1,6 +1,5 @@
-import json
-
 from django.contrib.auth.hashers import make_password
+from django.db.models import Prefetch
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -33,6 +32,28 @@ class UserSerializer(serializers.ModelSerializer):
             },
         }
 
+    @staticmethod
+    def is_compact(request):
+        return request is not None and request.query_params.get('compact', '').lower() in ('1', 'true')
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Подгружает участие в проектах (вместе с названиями проектов) и историю проектов для всей выборки
+        пользователей двумя запросами, чтобы `get_projects` и `get_history` не обращались к базе.
+        """
+        return queryset.prefetch_related(
+            Prefetch('hiring_set', queryset=Hiring.objects.select_related('project').order_by('id')),
+            'project_history',
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.is_compact(self.context.get('request')):
+            fields.pop('projects')
+            fields.pop('history')
+        return fields
+
     def save(self, **kwargs):
         return super().save(
             **kwargs,
@@ -41,11 +62,11 @@ class UserSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_history(obj):
-        return json.loads(obj.history)
+        return [i.title for i in obj.project_history.all()]
 
     @staticmethod
     def get_projects(obj):
-        return {i.project.title: i.role_in_project for i in Hiring.objects.filter(user_id=obj.id)}
+        return {i.project.title: i.role_in_project for i in obj.hiring_set.all()}
 
     @staticmethod
     def validate_email(attr):
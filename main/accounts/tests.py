@@ -2,7 +2,9 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from .models import CustomUser
+from task_traker.models import Project
+from .models import CustomUser, ProjectHistory
+from .serializers import UserSerializer
 
 
 class UserRegistrationTests(APITestCase):
@@ -32,3 +34,55 @@ class UserLoginTests(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
+
+
+class ProjectHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='Testemail@gmail.com',
+            email='Testemail@gmail.com',
+            password='testpassword',
+        )
+
+    def test_history_appended_once(self):
+        data = {
+            'title': 'Test Project',
+            'description': 'This is a test project.',
+            'status': 'active',
+            'users': ['Testemail@gmail.com'],
+        }
+        self.client.post(reverse('add_projects'), data, format='json')
+        project = Project.objects.get()
+        self.client.put(f'/api/v1/projects/{project.id}/update', data, format='json')
+        self.assertEqual(ProjectHistory.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(UserSerializer(self.user).data['history'], ['Test Project'])
+
+
+class UserProfileListTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='Testemail@gmail.com', password='testpassword')
+        self.client.force_authenticate(self.user)
+
+    def create_users(self, count):
+        project = Project.objects.create(title=f'Project {count}', description='This is a test project.')
+        for n in range(count):
+            user = CustomUser.objects.create(username=f'user{count}-{n}@gmail.com', password='testpassword')
+            project.users.add(user)
+            ProjectHistory.objects.create(user=user, project=project, title=project.title)
+
+    def test_queries_do_not_grow_with_users(self):
+        url = '/api/v1/profile/&'
+        self.create_users(2)
+        with self.assertNumQueries(3):
+            self.client.get(url, format='json')
+        self.create_users(5)
+        with self.assertNumQueries(3):
+            response = self.client.get(url, format='json')
+        self.assertEqual(len(response.data), 8)
+        self.assertEqual(response.data[-1]['projects'], {'Project 5': 'programmer'})
+
+    def test_compact(self):
+        self.create_users(2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/profile/&', {'compact': 1}, format='json')
+        self.assertNotIn('projects', response.data[0])
@@ -2,6 +2,7 @@ from rest_framework.generics import CreateAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from task_traker.asynchronous import AsyncAPIViewMixin
 from .models import CustomUser
 from .serializers import UserSerializer
 
@@ -11,17 +12,19 @@ class UserView(CreateAPIView):
     serializer_class = UserSerializer
 
 
-class UserProfileView(ListAPIView):
+class UserProfileView(AsyncAPIViewMixin, ListAPIView):
     """
     
     `UserProfileView` — представление на основе `ListAPIView`, предоставляющее API для получения профилей
-    пользователей, не являющихся администраторами (`is_staff=False`).
+    пользователей, не являющихся администраторами (`is_staff=False`). Обработчик `get` асинхронный
+    (`AsyncAPIViewMixin`).
     
     Атрибуты класса
     
     - serializer_class: `UserSerializer` — сериализатор для преобразования объектов `CustomUser` в JSON.
     - permission_classes: `[IsAuthenticated]` — доступ только для аутентифицированных пользователей.
     - queryset: Фильтрует пользователей, исключая администраторов.
+    - query_budget: `{'GET': 3}` — бюджет SQL-запросов по методам HTTP.
     
     Методы класса
     
@@ -34,25 +37,32 @@ class UserProfileView(ListAPIView):
     Обрабатывает GET-запросы:
     
     - Если `pk` указан, возвращает данные пользователя с этим первичным ключом.
-    - Если `pk` не указан, возвращает список всех пользователей.
+    - Если `pk` не указан, возвращает список всех пользователей постранично.
+    - Участие в проектах и история проектов подгружаются для всей страницы пользователей фиксированным числом
+    запросов; с параметром `?compact=1` поля `projects` и `history` не возвращаются и не загружаются.
     """
     serializer_class = UserSerializer
+    query_budget = {'GET': 3}
     permission_classes = [IsAuthenticated]
     queryset = CustomUser.objects.filter(is_staff=False)
 
     def get_object(self):
         return self.request.user
 
-    def get(self, request, pk=None, **kwargs):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not UserSerializer.is_compact(self.request):
+            queryset = UserSerializer.setup_eager_loading(queryset)
+        return queryset
+
+    async def get(self, request, pk=None, **kwargs):
         if pk is not None:
-            user = self.queryset.filter(pk=pk).first()
+            user = await self.get_queryset().filter(pk=pk).afirst()
             return Response(data=[self.get_serializer(user).data], status=200)
         else:
-            return Response(
-                data=[
-                    self.get_serializer(
-                        user
-                    ).data for user in self.get_queryset()
-                ],
-                status=200,
+            return self.get_paginated_response(
+                self.get_serializer(
+                    await self.apaginate_queryset(self.get_queryset()),
+                    many=True,
+                ).data,
             )
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'accounts',
     'rest_framework_simplejwt',
+    'websoket',
 ]
 
 MIDDLEWARE = [
@@ -37,6 +38,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_QUERY_THRESHOLD = int(os.getenv('PROFILING_QUERY_THRESHOLD', 20))
+PROFILING_LATENCY_THRESHOLD = int(os.getenv('PROFILING_LATENCY_THRESHOLD', 500))
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'task_traker.profiling.ProfilingMiddleware')
+
 ROOT_URLCONF = 'main.urls'
 
 TEMPLATES = [
@@ -68,9 +75,28 @@ DATABASES = {
         "HOST": os.getenv('POSTGRES_HOST'),
         "PORT": os.getenv('POSTGRES_PORT'),
         "USER": os.getenv('POSTGRES_USER'),
+        'CONN_HEALTH_CHECKS': os.getenv('CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+# Пул подключений psycopg 3 (только PostgreSQL). Пул общий для всех потоков процесса и открывается при первом
+# запросе, поэтому работает и под WSGI, и под ASGI, где у каждого запроса свой поток `sync_to_async`;
+# DATABASE_POOL_MAX_SIZE ограничивает число одновременных запросов к базе в процессе. С CONN_HEALTH_CHECKS пул
+# проверяет подключение перед выдачей. Без пула подключение живёт CONN_MAX_AGE секунд.
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'True') == 'True'
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and DATABASE_POOL:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', 300)),
+            'max_lifetime': float(os.getenv('DATABASE_POOL_MAX_LIFETIME', 3600)),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 0))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,8 +130,31 @@ REST_FRAMEWORK = {
     ],
     'DATETIME_FORMAT': "%Y-%m-%d %H:%M",
     'AUTH_COOKIE': 'Authorization',
+    'DEFAULT_PAGINATION_CLASS': 'task_traker.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', 50)),
 }
 
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 2000))
+
+BULK_TASKS_MAX = int(os.getenv('BULK_TASKS_MAX', 1000))
+
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'russian')
+
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv('CHANGE_LOG_RETENTION_DAYS', 30))
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv('CHANGE_FEED_SETTLE_SECONDS', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+# Кэш ответов работает только с общим кэшем, поэтому по умолчанию включается вместе с CACHE_BACKEND.
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True' if os.getenv('CACHE_BACKEND') else 'False') == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -117,17 +166,36 @@ MEDIA_URL = 'v1/media/'
 
 MEDIA_ROOT = BASE_DIR / 'task_traker/media/'
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
 EMAIL_USE_TLS = True
 
+MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 100))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+MAIL_OUTBOX_RETRY_DELAY = int(os.getenv('MAIL_OUTBOX_RETRY_DELAY', 60))
+
+NOTIFICATION_DELIVERY_THREAD = os.getenv('NOTIFICATION_DELIVERY_THREAD', 'True') == 'True'
+NOTIFICATION_QUEUE_SIZE = int(os.getenv('NOTIFICATION_QUEUE_SIZE', 1000))
+
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        'BACKEND': os.getenv('CHANNEL_LAYER_BACKEND', 'websoket.layers.DatabaseChannelLayer'),
+        'CONFIG': {
+            'expiry': int(os.getenv('CHANNEL_LAYER_EXPIRY', 60)),
+            'capacity': int(os.getenv('CHANNEL_LAYER_CAPACITY', 100)),
+        },
     },
 }
 
+WEBSOCKET_COALESCE_WINDOW = float(os.getenv('WEBSOCKET_COALESCE_WINDOW', 0.05))
+WEBSOCKET_QUEUE_SIZE = int(os.getenv('WEBSOCKET_QUEUE_SIZE', 1000))
+WEBSOCKET_SEND_TIMEOUT = float(os.getenv('WEBSOCKET_SEND_TIMEOUT', 10))
+WEBSOCKET_METRICS_FLUSH_INTERVAL = float(os.getenv('WEBSOCKET_METRICS_FLUSH_INTERVAL', 5))
+WEBSOCKET_METRICS_FLUSH_THREAD = os.getenv('WEBSOCKET_METRICS_FLUSH_THREAD', 'True') == 'True'
+WEBSOCKET_METRICS_GAUGE_TTL = float(os.getenv('WEBSOCKET_METRICS_GAUGE_TTL', 3 * WEBSOCKET_METRICS_FLUSH_INTERVAL))
+
 DJANGO_SETTINGS_MODULE = BASE_DIR / 'main/setting.py'
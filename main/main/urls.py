@@ -38,4 +38,5 @@ urlpatterns = [
     re_path(r'^api/v1/token/$', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     re_path(r'^api/v1/', include('task_traker.urls')),
     re_path(r'^api/v1/', include('accounts.urls')),
+    re_path(r'^api/v1/', include('websoket.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,9 +1,12 @@
 from django.contrib import admin
 
-from .models import CustomUser, Task, Project, Hiring
+from .models import CustomUser, Task, Project, Hiring, ProjectStats, OutgoingMail, Change
 
 
 admin.site.register(CustomUser)
 admin.site.register(Task)
 admin.site.register(Project)
 admin.site.register(Hiring)
+admin.site.register(ProjectStats)
+admin.site.register(OutgoingMail)
+admin.site.register(Change)
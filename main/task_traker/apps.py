@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TaskTrakerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_traker'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,42 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+
+class AsyncAPIViewMixin:
+    """
+    Асинхронная обработка запросов для представлений DRF.
+
+    Обработчики методов (`get`, `post`) объявляются через `async def` и читают базу асинхронным ORM, поэтому под
+    ASGI медленный запрос к базе не занимает поток и один процесс обслуживает много читателей одновременно.
+    Аутентификация, проверка прав и ограничение частоты (`initial`) синхронны и обращаются к базе, поэтому
+    выполняются в потоке (`sync_to_async`). Сериализатор должен получать уже загруженные объекты
+    (`setup_eager_loading`): обращение к базе при сериализации внутри цикла событий вызовет
+    `SynchronousOnlyOperation`.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
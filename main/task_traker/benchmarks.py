@@ -0,0 +1,181 @@
+import datetime
+import itertools
+import statistics
+import time
+import tracemalloc
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from .models import Comment, CustomUser, Hiring, Project, Task
+from .seeding import seed
+
+# Размеры набора данных: параметры `seed` для каждого прогона.
+SIZES = {
+    'small': {'projects': 10, 'users': 20, 'members': 5, 'tasks': 20, 'comments': 2},
+    'medium': {'projects': 50, 'users': 100, 'members': 10, 'tasks': 100, 'comments': 2},
+    'large': {'projects': 200, 'users': 500, 'members': 20, 'tasks': 250, 'comments': 2},
+}
+DEADLINE = (datetime.datetime.today() + datetime.timedelta(days=7)).strftime('%Y-%m-%d %H:%M')
+_counter = itertools.count()
+
+
+def get_link(view, pk):
+    return f'http://testserver/api/v1/{view}/{pk}'
+
+
+class Fixtures:
+    """Объекты засеянной базы, на которых выполняются запросы: публичный проект с задачами, участник, задача."""
+
+    def __init__(self):
+        self.project = Project.objects.filter(private=False).exclude(task=None).exclude(hiring=None).first()
+        self.user = Hiring.objects.filter(project=self.project).first().user
+        self.task = Task.objects.filter(project=self.project).exclude(comment=None).first() or \
+            Task.objects.filter(project=self.project).first()
+        self.comment = Comment.objects.filter(task=self.task).first()
+        self.tasks = list(Task.objects.filter(project=self.project).values_list('id', flat=True)[:50])
+
+    def new_task(self):
+        return Task.objects.create(title=f'Victim {next(_counter)}', description='benchmark', project=self.project)
+
+    def new_project(self):
+        return Project.objects.create(title=f'Victim {next(_counter)}', description='benchmark')
+
+    def new_comment(self):
+        return Comment.objects.create(task=self.task, text='benchmark')
+
+    def task_data(self):
+        return {
+            'title': f'Benchmark task {next(_counter)}',
+            'description': 'benchmark',
+            'deadline': DEADLINE,
+            'project': get_link('projects', self.project.id),
+            'executor': get_link('profile', self.user.id),
+            'status': 'in_progress',
+            'priority': 0,
+        }
+
+
+def get_cases(fixtures):
+    """
+    Запросы ко всем эндпоинтам `task_traker.urls` и `accounts.urls`: имя, метод и функция, которая готовит путь и
+    тело запроса. Подготовка (например, создание удаляемого объекта) в замер не входит.
+    """
+    f = fixtures
+    project, task = f.project.id, f.task.id
+    return [
+        ('projects', 'get', lambda: ('/api/v1/projects/', None)),
+        ('projects (post)', 'post', lambda: ('/api/v1/projects/', {'order_by': 'title'})),
+        ('projects/add', 'post', lambda: ('/api/v1/projects/add', {
+            'title': f'Benchmark project {next(_counter)}',
+            'description': 'benchmark',
+            'status': 'active',
+            'users': [f.user.email],
+        })),
+        ('projects/<pk>', 'get', lambda: (f'/api/v1/projects/{project}', None)),
+        ('projects/<pk>/roles', 'get', lambda: (f'/api/v1/projects/{project}/roles', None)),
+        ('projects/<pk>/roles (put)', 'put', lambda: (f'/api/v1/projects/{project}/roles', {
+            'user': get_link('profile', f.user.id),
+            'role_in_project': 'tester',
+        })),
+        ('projects/<pk>/delete', 'delete', lambda: (f'/api/v1/projects/{f.new_project().id}/delete', None)),
+        ('projects/<pk>/update', 'get', lambda: (f'/api/v1/projects/{project}/update', None)),
+        ('projects/<pk>/update (put)', 'put', lambda: (f'/api/v1/projects/{project}/update', {
+            'description': f'benchmark {next(_counter)}',
+        })),
+        ('projects/<pk>/tasks', 'get', lambda: (f'/api/v1/projects/{project}/tasks', None)),
+        ('projects/<pk>/tasks (post)', 'post', lambda: (f'/api/v1/projects/{project}/tasks', {'deadline': DEADLINE})),
+        ('tasks', 'get', lambda: ('/api/v1/tasks/', None)),
+        ('tasks (post)', 'post', lambda: ('/api/v1/tasks/', {'status': 'done', 'sort_by': '-date_updated'})),
+        ('tasks/add', 'post', lambda: ('/api/v1/tasks/add', f.task_data())),
+        ('tasks/bulk', 'post', lambda: ('/api/v1/tasks/bulk', {
+            'project': get_link('projects', project),
+            'tasks': [{**f.task_data(), 'executor': get_link('profile', f.user.id)} for _ in range(50)],
+        })),
+        ('tasks/bulk/update', 'put', lambda: ('/api/v1/tasks/bulk/update', {'tasks': f.tasks, 'status': 'dev'})),
+        ('tasks/<pk>', 'get', lambda: (f'/api/v1/tasks/{task}', None)),
+        ('tasks/<pk>/delete', 'delete', lambda: (f'/api/v1/tasks/{f.new_task().id}/delete', None)),
+        ('tasks/<pk>/update', 'get', lambda: (f'/api/v1/tasks/{task}/update', None)),
+        ('tasks/<pk>/update (put)', 'put', lambda: (f'/api/v1/tasks/{task}/update', {'priority': 1})),
+        ('tasks/<pk>/comments', 'get', lambda: (f'/api/v1/tasks/{task}/comments', None)),
+        ('tasks/<pk>/comments (post)', 'post', lambda: (f'/api/v1/tasks/{task}/comments', {'text': 'benchmark'})),
+        ('comments/<pk>/delete', 'delete', lambda: (
+            f'/api/v1/tasks/{task}/comments/{f.new_comment().id}/delete', None,
+        )),
+        ('comments/<pk>/update', 'put', lambda: (
+            f'/api/v1/tasks/{task}/comments/{f.comment.id}/update', {'text': f'benchmark {next(_counter)}'},
+        ) if f.comment else (f'/api/v1/tasks/{task}/comments/{f.new_comment().id}/update', {'text': 'benchmark'})),
+        ('search', 'get', lambda: ('/api/v1/search/?q=сервер', None)),
+        ('changes', 'get', lambda: ('/api/v1/changes/?cursor=0', None)),
+        ('register', 'post', lambda: ('/api/v1/register/', {
+            'first_name': 'Benchmark',
+            'last_name': 'User',
+            'email': f'benchmark{next(_counter)}@example.com',
+            'password': 'password',
+        })),
+        ('profile/<pk>', 'get', lambda: (f'/api/v1/profile/{f.user.id}', None)),
+        ('profile', 'get', lambda: ('/api/v1/profile/&', None)),
+        ('profile (compact)', 'get', lambda: ('/api/v1/profile/&?compact=1', None)),
+    ]
+
+
+def get_percentile(values, percentile):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(percentile / 100 * (len(values) - 1)))]
+
+
+def measure(client, method, prepare, iterations):
+    """Задержки (мс), число SQL-запросов и пиковая память (КБ) одного эндпоинта за `iterations` запросов."""
+    latencies, queries, statuses = [], [], set()
+    for _ in range(iterations):
+        path, data = prepare()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, format='json')
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    # Память меряется отдельным запросом: под tracemalloc запросы заметно медленнее.
+    path, data = prepare()
+    tracemalloc.start()
+    try:
+        getattr(client, method)(path, data, format='json')
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'p50_ms': round(get_percentile(latencies, 50), 2),
+        'p95_ms': round(get_percentile(latencies, 95), 2),
+        'p99_ms': round(get_percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.mean(latencies), 2),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'statuses': sorted(statuses),
+    }
+
+
+def run(sizes=('small',), iterations=20, cases=None, stdout=None):
+    """
+    Для каждого размера из `SIZES` очищает базу, засевает её (`seed`) и выполняет все запросы `get_cases`
+    (или только перечисленные в `cases`) по `iterations` раз. Кэш ответов отключается, чтобы мерить сами
+    представления. Возвращает словарь «размер → эндпоинт → метрики».
+    """
+    results = {}
+    with override_settings(RESPONSE_CACHE_ENABLED=False):
+        for size in sizes:
+            call_command('flush', interactive=False, verbosity=0)
+            created = seed(**SIZES[size])
+            fixtures = Fixtures()
+            client = APIClient()
+            client.force_authenticate(CustomUser.objects.create(username='benchmark', is_staff=True))
+            results[size] = {'dataset': created, 'endpoints': {}}
+            for name, method, prepare in get_cases(fixtures):
+                if cases and name not in cases:
+                    continue
+                results[size]['endpoints'][name] = measure(client, method, prepare, iterations)
+                if stdout is not None:
+                    stdout.write(f'{size} {name}: {results[size]["endpoints"][name]}')
+    return results
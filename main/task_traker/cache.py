@@ -0,0 +1,160 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+VERSION_KEY = 'response_version:{}'
+RESPONSE_KEY = 'response:{}:{}:{}'
+STATS_KEY = 'response_cache:{}'
+ALL_PROJECTS = 'all'
+CACHED_HEADERS = ('Link', 'X-Next-Cursor', 'X-Previous-Cursor')
+# Кэши, которые видит только один процесс: версии, увеличенные одним процессом, не видны другим.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def is_shared_backend():
+    return settings.CACHES[settings.RESPONSE_CACHE_ALIAS]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def is_enabled():
+    """
+    Кэш ответов работает только с общим кэшем (база данных, Redis, Memcached): с кэшем в памяти процесса запись в
+    одном процессе не сбросила бы ответы, закэшированные другими. Такой кэш при `RESPONSE_CACHE_ENABLED` не
+    используется, а проверка `task_traker.W001` предупреждает об этом.
+    """
+    return settings.RESPONSE_CACHE_ENABLED and is_shared_backend()
+
+
+def get_version(scope):
+    # Начальное значение — текущее время, чтобы после вытеснения ключа из кэша версия не вернулась к старой.
+    cache = get_cache()
+    key = VERSION_KEY.format(scope)
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def bump_version(scope):
+    cache = get_cache()
+    key = VERSION_KEY.format(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_project_version(project_id):
+    """
+    Сбрасывает закэшированные ответы проекта и общих списков. Версии увеличиваются сразу и ещё раз после коммита,
+    чтобы ответ, прочитанный параллельным запросом до коммита, не остался в кэше под новой версией.
+    """
+    def bump():
+        bump_version(project_id)
+        bump_version(ALL_PROJECTS)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def count(event):
+    cache = get_cache()
+    key = STATS_KEY.format(event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    cache = get_cache()
+    return {i: cache.get(STATS_KEY.format(i), 0) for i in ('hits', 'misses')}
+
+
+def get_request_key(request):
+    data = request.data if request.method != 'GET' else None
+    etag = getattr(request, 'etag', None)
+    raw = json.dumps([request.method, request.build_absolute_uri(), data, etag], cls=JSONEncoder, sort_keys=True)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_response_key(endpoint, per_project, request, kwargs):
+    scope = kwargs.get('pk') if per_project else None
+    return RESPONSE_KEY.format(endpoint, get_version(scope or ALL_PROJECTS), get_request_key(request))
+
+
+def get_cached_response(key):
+    cached = get_cache().get(key)
+    if cached is None:
+        count('misses')
+        return None
+    count('hits')
+    return Response(data=cached['data'], status=cached['status'], headers={
+        **cached['headers'],
+        'X-Cache': 'HIT',
+    })
+
+
+def store_response(key, response):
+    if isinstance(response, Response) and response.status_code == 200:
+        get_cache().set(
+            key,
+            {
+                'data': response.data,
+                'status': response.status_code,
+                'headers': {i: response[i] for i in CACHED_HEADERS if i in response},
+            },
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_response(endpoint, per_project=False):
+    """
+    Кэширует ответ метода представления.
+
+    Работает, только если кэш ответов включён и общий для всех процессов (`is_enabled`). Ключ строится из имени
+    `endpoint`, версии и метода, адреса и тела запроса, а под `conditional_response` — ещё и из `ETag` ответа.
+    Для `per_project=True` версия берётся у проекта из `kwargs['pk']`, иначе — общая версия всех проектов.
+    Версии увеличиваются сигналами при изменении задач, участников и их профилей, комментариев и самих проектов,
+    поэтому старые записи просто перестают читаться и вытесняются по `RESPONSE_CACHE_TIMEOUT`. Асинхронные методы
+    обращаются к кэшу в потоке.
+    """
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if not is_enabled():
+                    return await method(self, request, *args, **kwargs)
+                key = await sync_to_async(get_response_key)(endpoint, per_project, request, kwargs)
+                response = await sync_to_async(get_cached_response)(key)
+                if response is None:
+                    response = await method(self, request, *args, **kwargs)
+                    await sync_to_async(store_response)(key, response)
+                return response
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_enabled():
+                return method(self, request, *args, **kwargs)
+            key = get_response_key(endpoint, per_project, request, kwargs)
+            response = get_cached_response(key)
+            if response is None:
+                response = store_response(key, method(self, request, *args, **kwargs))
+            return response
+        return wrapper
+    return decorator
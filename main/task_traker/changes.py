@@ -0,0 +1,100 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Change
+
+
+class ChangeBatch:
+    """
+    Записи журнала изменений одной транзакции. Копятся в памяти и вставляются одним `bulk_create` после коммита:
+    так курсоры выдаются в порядке коммитов, и клиент не пропустит изменения транзакции, которая началась раньше,
+    а закончилась позже. Пачка относится к одной точке сохранения: при откате транзакции или точки сохранения
+    записи пропадают вместе с изменениями.
+    """
+
+    def __init__(self):
+        self.changes = []
+        self.flushed = False
+
+    def add(self, change):
+        self.changes.append(change)
+
+    def flush(self):
+        changes, self.changes = self.changes, []
+        self.flushed = True
+        # Время записи — время вставки, а не изменения: по нему `get_changes` ждёт, пока вставка станет видна.
+        now = datetime.datetime.today()
+        for change in changes:
+            change.date_created = now
+        Change.objects.bulk_create(changes)
+
+
+def _get_batch(connection):
+    """Открытая пачка текущей точки сохранения — как `notifications._get_batch`."""
+    if not connection.in_atomic_block or not connection.run_on_commit:
+        return None
+    sids, func, _ = connection.run_on_commit[-1]
+    batch = getattr(func, '__self__', None)
+    if isinstance(batch, ChangeBatch) and not batch.flushed and sids == set(connection.savepoint_ids):
+        return batch
+    return None
+
+
+def record_changes(kind, objects, action, using=None):
+    """
+    Добавляет в журнал изменение объектов `objects` — пар `(object_id, project_id)`. Записи вставляются после
+    коммита текущей транзакции (`transaction.on_commit`); вне транзакции — сразу.
+    """
+    batch = _get_batch(transaction.get_connection(using))
+    opened = batch is None
+    if opened:
+        batch = ChangeBatch()
+    for object_id, project_id in objects:
+        batch.add(Change(kind=kind, object_id=object_id, project_id=project_id, action=action))
+    if opened:
+        # Вне транзакции колбэк выполняется сразу, поэтому регистрируется после того, как записи добавлены.
+        transaction.on_commit(batch.flush, using=using, robust=True)
+
+
+def record_change(kind, object_id, project_id, action):
+    record_changes(kind, [(object_id, project_id)], action)
+
+
+def get_changes(cursor, project_id=None, limit=100):
+    """
+    Записи журнала после курсора `cursor` в порядке `id`. Записи, вставленные меньше `CHANGE_FEED_SETTLE_SECONDS`
+    секунд назад, не отдаются: курсор не должен обогнать вставку, которая ещё не видна параллельным транзакциям.
+    """
+    changes = Change.objects.filter(id__gt=cursor).order_by('id')
+    if project_id is not None:
+        changes = changes.filter(project_id=project_id)
+    changes = list(changes[:limit + 1])
+    settled = datetime.datetime.today() - datetime.timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    for n, change in enumerate(changes):
+        if change.date_created > settled:
+            return changes[:n], False
+    return changes[:limit], len(changes) > limit
+
+
+def is_expired(cursor):
+    """
+    Курсор устарел, если записи после него уже удалены `prune_change_log` и лента неполна. Это относится и к
+    курсору `0`: после очистки журнала синхронизация с начала не получит всей истории.
+    """
+    oldest = Change.objects.order_by('id').values_list('id', flat=True).first()
+    return oldest is not None and oldest > cursor + 1
+
+
+def prune_changes(days=None):
+    """
+    Удаляет записи старше `days` дней (по умолчанию `CHANGE_LOG_RETENTION_DAYS`). Последняя запись сохраняется
+    всегда, чтобы `is_expired` мог отличить устаревший курсор от пустого журнала.
+    """
+    days = settings.CHANGE_LOG_RETENTION_DAYS if days is None else days
+    latest = Change.objects.order_by('-id').values_list('id', flat=True).first()
+    deleted, _ = Change.objects.filter(
+        date_created__lt=datetime.datetime.today() - datetime.timedelta(days=days),
+    ).exclude(id=latest).delete()
+    return deleted
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_shared_backend
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    if settings.RESPONSE_CACHE_ENABLED and not is_shared_backend():
+        return [
+            Warning(
+                'Кэш ответов включён, но кэш RESPONSE_CACHE_ALIAS хранится в памяти процесса, поэтому ответы '
+                'не кэшируются.',
+                hint='Укажите общий кэш в CACHE_BACKEND (например, django.core.cache.backends.db.DatabaseCache '
+                     'или django.core.cache.backends.redis.RedisCache) или выключите RESPONSE_CACHE_ENABLED.',
+                id='task_traker.W001',
+            ),
+        ]
+    return []
@@ -0,0 +1,144 @@
+import datetime
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Project, ProjectStats, Task
+
+
+class ListState(tuple):
+    """
+    Состояние списка: время последнего изменения и число строк. Удаление строки не меняет `Max('date_updated')`,
+    поэтому для списков отдаётся только `ETag` (в него входит число строк), а `Last-Modified` и
+    `If-Modified-Since` не используются.
+    """
+
+
+def task_state(view, request, pk=None, **kwargs):
+    if pk is not None:
+        return Task.objects.filter(pk=pk).values_list('date_updated', flat=True).first(), pk
+    state = Task.objects.aggregate(last_modified=Max('date_updated'), count=Count('id'))
+    return ListState((state['last_modified'], state['count']))
+
+
+def project_tasks_state(view, request, pk, **kwargs):
+    state = Task.objects.filter(project_id=pk).aggregate(last_modified=Max('date_updated'), count=Count('id'))
+    return ListState((state['last_modified'], state['count']))
+
+
+def get_deadline_aggregates():
+    """
+    Самые поздние дедлайны, вошедшие в окно `ProjectStats.get_deadline_range` и вышедшие из него. По ним видно, когда
+    список задач с близким дедлайном изменился без изменения самих задач.
+    """
+    start, end = ProjectStats.get_deadline_range()
+    return {
+        'deadline_entered': Max('task__deadline', filter=Q(task__deadline__lte=end)),
+        'deadline_left': Max('task__deadline', filter=Q(task__deadline__lt=start)),
+    }
+
+
+def get_modified(last_modified, stats_modified, deadline_entered, deadline_left):
+    if deadline_entered is not None:
+        deadline_entered -= datetime.timedelta(days=ProjectStats.DEADLINE_DAYS)
+    return max((i for i in (last_modified, stats_modified, deadline_entered, deadline_left) if i is not None),
+               default=None)
+
+
+def project_state(view, request, pk=None, **kwargs):
+    """
+    Задачи и роли входят в представление проекта, поэтому вместе с `date_updated` проекта учитывается
+    `date_updated` его статистики: она пересчитывается при каждом изменении и удалении задачи. Список задач с
+    близким дедлайном меняется и со временем, поэтому учитывается и момент, когда задача последний раз вошла в окно
+    дедлайна или вышла из него.
+    """
+    if pk is not None:
+        row = Project.objects.filter(pk=pk).annotate(**get_deadline_aggregates()).values_list(
+            'date_updated', 'stats__date_updated', 'deadline_entered', 'deadline_left',
+        ).first()
+        return (get_modified(*row), pk) if row else (None,)
+    state = Project.objects.filter(private=False).aggregate(
+        last_modified=Max('date_updated'),
+        stats_modified=Max('stats__date_updated'),
+        count=Count('id', distinct=True),
+        **get_deadline_aggregates(),
+    )
+    count = state.pop('count')
+    return ListState((get_modified(**state), count))
+
+
+def get_etag(request, state):
+    raw = json.dumps([request.get_full_path(), request.accepted_media_type, *state], cls=DjangoJSONEncoder)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def get_validators(request, state):
+    etag = get_etag(request, state)
+    # `cache_response` добавляет `ETag` к ключу кэша: ответ меняется вместе с состоянием, даже если версии кэша
+    # не увеличивались (например, задача вошла в окно дедлайна).
+    request.etag = etag
+    last_modified = None
+    if not isinstance(state, ListState):
+        last_modified = int(timezone.make_aware(state[0]).timestamp())
+    return etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response.headers.setdefault('ETag', etag)
+    if last_modified is not None:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+def conditional_response(get_state):
+    """
+    Условный GET для метода представления.
+
+    `get_state(view, request, *args, **kwargs)` одним лёгким запросом возвращает кортеж, первый элемент которого —
+    время последнего изменения (`date_updated`), а остальные — значения, которые меняются вместе с ответом
+    (для списков — число строк). Из него строятся заголовки `ETag` и `Last-Modified` (для `ListState` — только
+    `ETag`); если клиент прислал совпадающий `If-None-Match` или `If-Modified-Since`, возвращается `304 Not Modified` без выборки и сериализации
+    данных. Если объекта нет (`None` вместо времени), метод выполняется как обычно. Для асинхронных методов
+    `get_state` выполняется в потоке.
+    """
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await method(self, request, *args, **kwargs)
+                state = await sync_to_async(get_state)(self, request, *args, **kwargs)
+                if state[0] is None:
+                    return await method(self, request, *args, **kwargs)
+
+                etag, last_modified, response = get_validators(request, state)
+                if response is None:
+                    response = await method(self, request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return set_validators(response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(self, request, *args, **kwargs)
+            state = get_state(self, request, *args, **kwargs)
+            if state[0] is None:
+                return method(self, request, *args, **kwargs)
+
+            etag, last_modified, response = get_validators(request, state)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
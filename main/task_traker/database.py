@@ -0,0 +1,14 @@
+from django.db import connections
+
+
+def get_pool_stats():
+    """
+    Состояние пулов подключений к базе в текущем процессе по псевдонимам баз: размер пула, свободные подключения,
+    ожидающие запросы и накопленные счётчики `psycopg_pool` (`ConnectionPool.get_stats`). `None` — у базы нет пула
+    (`DATABASE_POOL=False` или не PostgreSQL).
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        stats[alias] = pool.get_stats() if pool is not None else None
+    return stats
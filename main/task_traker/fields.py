@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from rest_framework import serializers
+
+USER_CHOICES_CACHE_KEY = 'user_choices:{}'
+USER_CHOICES_TIMEOUT = 300
+
+_user_choice_keys = set()
+
+
+def invalidate_user_choices():
+    cache.delete_many([USER_CHOICES_CACHE_KEY.format(i) for i in _user_choice_keys])
+
+
+class UserChoiceField(serializers.ChoiceField):
+    """
+    Поле выбора пользователя, список вариантов которого строится лениво.
+
+    Варианты нужны только для форм browsable API и схемы документации: они строятся при первом обращении,
+    кэшируются под ключом `cache_name` и сбрасываются при создании, изменении или удалении пользователя
+    (`invalidate_user_choices`). Проверка значения — это один запрос по первичному ключу, без загрузки списка.
+    """
+
+    def __init__(self, cache_name, queryset, label_field, allow_any=False, **kwargs):
+        self.cache_name = cache_name
+        self.queryset = queryset
+        self.label_field = label_field
+        self.allow_any = allow_any
+        _user_choice_keys.add(cache_name)
+        super().__init__(choices=[], **kwargs)
+
+    def get_label(self, user):
+        return self.label_field(user) if callable(self.label_field) else getattr(user, self.label_field)
+
+    def build_choices(self):
+        choices = {None: 'Any'} if self.allow_any else {}
+        choices.update({user.id: self.get_label(user) for user in self.queryset.order_by('id').iterator()})
+        return choices
+
+    def _get_choices(self):
+        return cache.get_or_set(
+            USER_CHOICES_CACHE_KEY.format(self.cache_name),
+            self.build_choices,
+            USER_CHOICES_TIMEOUT,
+        )
+
+    def _set_choices(self, choices):
+        pass
+
+    choices = property(_get_choices, _set_choices)
+
+    @property
+    def grouped_choices(self):
+        return self.choices
+
+    def to_internal_value(self, data):
+        if data in ('', None, 'None') and self.allow_any:
+            return None
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('invalid_choice', input=data)
+        if not self.queryset.filter(pk=pk).exists():
+            self.fail('invalid_choice', input=data)
+        return pk
+
+    def to_representation(self, value):
+        return value
+
+
+class LinkedPkField(serializers.CharField):
+    """
+    Принимает гиперссылку на объект (как `HyperlinkedRelatedField`) или его идентификатор и возвращает
+    идентификатор, не обращаясь к базе данных. Существование объекта проверяется вызывающим кодом одним запросом
+    на весь набор значений.
+    """
+    default_error_messages = {
+        'invalid': 'Некорректная ссылка на объект: {value}',
+    }
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            return int(value.rstrip('/').split('/')[-1])
+        except ValueError:
+            self.fail('invalid', value=value)
@@ -0,0 +1,88 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+
+from .models import OutgoingMail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    return OutgoingMail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+
+
+def get_retry_delay(attempts):
+    return datetime.timedelta(seconds=settings.MAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def mark_failed(mail, error, max_attempts):
+    mail.attempts += 1
+    mail.last_error = str(error)
+    if mail.attempts >= max_attempts:
+        mail.status = 'failed'
+    else:
+        mail.next_attempt_at = datetime.datetime.today() + get_retry_delay(mail.attempts)
+    mail.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_queued_mail(batch_size=None, max_attempts=None):
+    """
+    Отправляет одну пачку писем, срок отправки которых наступил, через одно открытое соединение почтового бэкенда.
+
+    Неудачная отправка откладывает письмо с экспоненциально растущей задержкой (`MAIL_OUTBOX_RETRY_DELAY`, затем
+    вдвое больше и т.д.); после `max_attempts` попыток письмо помечается как `failed`.
+    Возвращает количество отправленных писем.
+    """
+    batch_size = batch_size or settings.MAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.MAIL_OUTBOX_MAX_ATTEMPTS
+    sent = 0
+    with transaction.atomic():
+        batch = list(
+            OutgoingMail.objects.select_for_update(skip_locked=True).filter(
+                status='pending',
+                next_attempt_at__lte=datetime.datetime.today(),
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not batch:
+            return sent
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            logger.warning('Не удалось открыть соединение с почтовым сервером: %s', error)
+            for mail in batch:
+                mark_failed(mail, error, max_attempts)
+            return sent
+
+        try:
+            for mail in batch:
+                message = EmailMessage(
+                    mail.subject,
+                    mail.body,
+                    mail.from_email,
+                    mail.recipients,
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as error:
+                    logger.warning('Не удалось отправить письмо %s: %s', mail.id, error)
+                    mark_failed(mail, error, max_attempts)
+                    continue
+                mail.status = 'sent'
+                mail.attempts += 1
+                mail.date_sent = datetime.datetime.today()
+                mail.save(update_fields=['status', 'attempts', 'date_sent'])
+                sent += 1
+        finally:
+            connection.close()
+    return sent
@@ -0,0 +1,173 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import QuerySet
+
+from task_traker.conditional import project_state, project_tasks_state
+from task_traker.models import Change, Comment, Hiring, Project, ProjectStats, Task
+from task_traker.serializers import FilterTasksSerializer
+
+FULL_SCAN_MARKERS = {
+    'sqlite': (),
+    'postgresql': ('Seq Scan',),
+}
+SORT_MARKERS = {
+    'sqlite': ('USE TEMP B-TREE',),
+    'postgresql': ('Sort',),
+}
+
+
+def get_query_shapes(page_size=50):
+    """
+    Формы запросов, которые выполняют представления и сериализаторы `task_traker`: наборы записей или функции,
+    запросы которых перехватываются при вызове (`get_plans`), чтобы форма не расходилась с кодом.
+    Значения параметров произвольные: важен только план выполнения.
+    """
+    today = datetime.datetime.today()
+    shapes = [
+        (
+            'TaskSerializer.validate_title',
+            Task.objects.filter(title='title', project_id=1),
+        ),
+        (
+            'TaskProjectView.get',
+            Task.objects.filter(project_id=1).order_by('-date_updated', '-id')[:page_size + 1],
+        ),
+        (
+            'TaskProjectView.post',
+            Task.objects.filter(
+                project_id=1,
+                deadline__range=(today, today + datetime.timedelta(days=7)),
+            ).order_by('-date_updated', '-id')[:page_size + 1],
+        ),
+        (
+            'TasksView.post (executor, status)',
+            Task.objects.filter(executor_id=1, status='done'),
+        ),
+        (
+            'ProjectStats.get_deadline_tasks',
+            lambda: ProjectStats.get_deadline_tasks(1),
+        ),
+        (
+            'project_state (project)',
+            lambda: project_state(None, None, pk=1),
+        ),
+        (
+            'project_state (list)',
+            lambda: project_state(None, None),
+        ),
+        (
+            'project_tasks_state',
+            lambda: project_tasks_state(None, None, pk=1),
+        ),
+        (
+            'ProjectView.get',
+            Project.objects.filter(private=False).order_by('-date_updated', '-id')[:page_size + 1],
+        ),
+        (
+            'RolesProjectView.put (project, user)',
+            Hiring.objects.filter(project_id=1, user_id=1),
+        ),
+        (
+            'RolesProjectView.get',
+            Hiring.objects.filter(project_id=1).order_by('id')[:page_size + 1],
+        ),
+        (
+            'CommentsView.get',
+            Comment.objects.filter(task_id=1).order_by('id')[:page_size + 1],
+        ),
+        (
+            'ChangesView.get (project)',
+            Change.objects.filter(id__gt=1, project_id=1).order_by('id')[:page_size + 1],
+        ),
+    ]
+    for sort_by in FilterTasksSerializer().fields['sort_by'].choices:
+        tiebreaker = '-id' if sort_by.startswith('-') else 'id'
+        shapes.append(
+            (
+                f'TasksView.post (sort_by={sort_by})',
+                Task.objects.order_by(sort_by, tiebreaker)[:page_size + 1],
+            )
+        )
+    return shapes
+
+
+def explain_sql(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        return '\n'.join(' '.join(str(i) for i in row) for row in cursor.fetchall())
+
+
+def get_plans(shape):
+    """Планы выполнения формы: у набора записей — один, у функции — по одному на каждый выполненный ею запрос."""
+    if isinstance(shape, QuerySet):
+        return [shape.explain()]
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        shape()
+    return [explain_sql(sql, params) for sql, params in queries]
+
+
+def uses_index(plan, vendor):
+    if any(i in plan for i in FULL_SCAN_MARKERS[vendor]):
+        return False
+    if vendor == 'sqlite':
+        # Строка «SCAN <таблица>» без «USING ...» означает полный просмотр таблицы.
+        return not any(' SCAN ' in f' {line} ' and ' USING ' not in line for line in plan.splitlines())
+    return True
+
+
+def uses_sort(plan, vendor):
+    return any(i in plan for i in SORT_MARKERS[vendor])
+
+
+class Command(BaseCommand):
+    help = 'Выполняет EXPLAIN для каждой формы запроса представлений и сообщает, использует ли она индекс.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plan',
+            action='store_true',
+            help='Выводить полный план выполнения для каждого запроса',
+        )
+        parser.add_argument(
+            '--no-seqscan',
+            action='store_true',
+            help='PostgreSQL: запретить последовательное сканирование (SET enable_seqscan = off), чтобы на '
+                 'маленьких таблицах проверить, может ли запрос использовать индекс',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Завершиться с ошибкой, если хотя бы один запрос не использует индекс',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_MARKERS:
+            raise CommandError(f'EXPLAIN не поддерживается для базы данных {vendor}')
+        if options['no_seqscan'] and vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        without_index = []
+        for name, shape in get_query_shapes():
+            plan = '\n'.join(get_plans(shape))
+            if uses_index(plan, vendor) and uses_sort(plan, vendor):
+                self.stdout.write(self.style.SUCCESS(f'[index+sort] {name}'))
+            elif uses_index(plan, vendor):
+                self.stdout.write(self.style.SUCCESS(f'[index]      {name}'))
+            else:
+                without_index.append(name)
+                self.stdout.write(self.style.WARNING(f'[no index]   {name}'))
+            if options['verbose_plan']:
+                self.stdout.write(plan)
+
+        if without_index and options['strict']:
+            raise CommandError(f'Запросы без индекса: {", ".join(without_index)}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from task_traker.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из журнала изменений (Change) записи старше срока хранения CHANGE_LOG_RETENTION_DAYS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Срок хранения записей, дни')
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей журнала: {deleted}'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from task_traker.models import Project, ProjectStats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает таблицу статистики проектов (ProjectStats) по текущим задачам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_ids', nargs='*', type=int, help='Идентификаторы проектов (по умолчанию все)')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by('id')
+        if options['project_ids']:
+            projects = projects.filter(pk__in=options['project_ids'])
+        count = 0
+        for project_id in projects.values_list('id', flat=True).iterator():
+            ProjectStats.rebuild(project_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Статистика пересчитана для {count} проектов'))
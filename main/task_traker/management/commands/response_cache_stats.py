@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from task_traker.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = 'Выводит число попаданий и промахов кэша ответов.'
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = round(stats['hits'] / total * 100, 2) if total else 0
+        self.stdout.write(f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, доля попаданий: {ratio}%')
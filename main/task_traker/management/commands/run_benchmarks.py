@@ -0,0 +1,109 @@
+import datetime
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from task_traker.benchmarks import SIZES, run
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Засевает базу синтетическими данными нескольких размеров и замеряет все эндпоинты API: перцентили '
+            'задержки, число SQL-запросов и пиковую память. По умолчанию работает на временной тестовой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small'], help='Размеры данных')
+        parser.add_argument('--iterations', type=int, default=20, help='Число запросов к каждому эндпоинту')
+        parser.add_argument('--endpoint', nargs='+', help='Замерять только эти эндпоинты')
+        parser.add_argument('--output', help='Записать результаты в JSON-файл')
+        parser.add_argument('--compare', help='Сравнить с результатами из JSON-файла')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20,
+            help='Рост p50 в процентах, после которого эндпоинт считается замедлившимся',
+        )
+        parser.add_argument(
+            '--use-current-db',
+            action='store_true',
+            help='Замерять на текущей базе. Её данные будут удалены!',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        previous = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                previous = json.load(file)
+
+        test_db = None
+        if not options['use_current_db']:
+            test_db = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+        try:
+            results = run(options['sizes'], options['iterations'], options['endpoint'])
+        finally:
+            if test_db is not None:
+                connection.creation.destroy_test_db(test_db, verbosity=0)
+
+        report = {
+            'meta': {
+                'commit': get_commit(),
+                'database': connection.vendor,
+                'date': datetime.datetime.today().isoformat(timespec='seconds'),
+                'iterations': options['iterations'],
+            },
+            'results': results,
+        }
+        self.write_report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Результаты записаны в {options["output"]}'))
+        if previous is not None:
+            self.write_comparison(previous, report, options['threshold'])
+
+    def write_report(self, results):
+        for size, result in results.items():
+            dataset = ', '.join(f'{name}: {value}' for name, value in result['dataset'].items())
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{size} ({dataset})'))
+            for name, metrics in result['endpoints'].items():
+                self.stdout.write(
+                    f'  {name:<30} p50 {metrics["p50_ms"]:>8} мс  p95 {metrics["p95_ms"]:>8} мс  '
+                    f'p99 {metrics["p99_ms"]:>8} мс  запросов {metrics["queries"]:>4}  '
+                    f'память {metrics["peak_memory_kb"]:>8} КБ  {metrics["statuses"]}'
+                )
+
+    def write_comparison(self, previous, current, threshold):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Сравнение с {previous["meta"].get("commit")} ({previous["meta"].get("database")})'
+        ))
+        for size, result in current['results'].items():
+            old_endpoints = previous['results'].get(size, {}).get('endpoints', {})
+            for name, metrics in result['endpoints'].items():
+                old = old_endpoints.get(name)
+                if old is None:
+                    continue
+                change = (metrics['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+                line = (
+                    f'  {size} {name:<30} p50 {old["p50_ms"]} → {metrics["p50_ms"]} мс ({change:+.0f}%), '
+                    f'запросов {old["queries"]} → {metrics["queries"]}'
+                )
+                if change > threshold or metrics['queries'] > old['queries']:
+                    self.stdout.write(self.style.WARNING(line))
+                else:
+                    self.stdout.write(line)
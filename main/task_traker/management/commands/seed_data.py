@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from task_traker.seeding import seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими проектами, пользователями, участниками, задачами и комментариями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=10, help='Число проектов')
+        parser.add_argument('--users', type=int, default=20, help='Число пользователей')
+        parser.add_argument('--members', type=int, default=5, help='Число участников в каждом проекте')
+        parser.add_argument('--tasks', type=int, default=20, help='Число задач в каждом проекте')
+        parser.add_argument('--comments', type=int, default=2, help='Среднее число комментариев на задачу')
+        parser.add_argument('--private', type=float, default=0.1, help='Доля приватных проектов')
+        parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+
+    def handle(self, *args, **options):
+        created = seed(
+            projects=options['projects'],
+            users=options['users'],
+            members=options['members'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            private=options['private'],
+            seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(', '.join(f'{name}: {value}' for name, value in created.items())))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from task_traker.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingMail пачками через одно соединение почтового бэкенда.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Размер пачки писем')
+        parser.add_argument('--max-attempts', type=int, default=None, help='Число попыток отправки письма')
+        parser.add_argument('--loop', action='store_true', help='Работать непрерывно, опрашивая очередь')
+        parser.add_argument('--interval', type=float, default=5, help='Пауза между опросами очереди, секунды')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_queued_mail(options['batch_size'], options['max_attempts'])
+            while sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+                sent = send_queued_mail(options['batch_size'], options['max_attempts'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
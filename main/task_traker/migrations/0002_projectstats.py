@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:04
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_project_stats(apps, schema_editor):
+    Project = apps.get_model('task_traker', 'Project')
+    ProjectStats = apps.get_model('task_traker', 'ProjectStats')
+    Task = apps.get_model('task_traker', 'Task')
+    deadline = datetime.datetime.today() + datetime.timedelta(days=3)
+    for project_id in Project.objects.values_list('id', flat=True).iterator():
+        tasks = Task.objects.filter(project_id=project_id)
+        statuses = {
+            i['status']: i['value'] for i in tasks.order_by().values('status').annotate(value=Count('id'))
+        }
+        ProjectStats.objects.create(
+            project_id=project_id,
+            value_tasks=sum(statuses.values()),
+            statuses=statuses,
+            deadline_tasks=list(tasks.filter(deadline__lte=deadline).order_by('id').values_list('title', flat=True)),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_traker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='tester',
+            field=models.CharField(blank=True, max_length=1000, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value_tasks', models.PositiveIntegerField(default=0)),
+                ('statuses', models.JSONField(default=dict)),
+                ('deadline_tasks', models.JSONField(default=list)),
+                ('date_updated', models.DateTimeField(default=datetime.datetime.today)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='task_traker.project')),
+            ],
+        ),
+        migrations.RunPython(build_project_stats, migrations.RunPython.noop),
+    ]
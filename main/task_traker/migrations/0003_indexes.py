@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_hirings(apps, schema_editor):
+    Hiring = apps.get_model('task_traker', 'Hiring')
+    seen = set()
+    duplicates = []
+    for pk, project_id, user_id in Hiring.objects.order_by('id').values_list('id', 'project_id', 'user_id'):
+        if (project_id, user_id) in seen:
+            duplicates.append(pk)
+        seen.add((project_id, user_id))
+    Hiring.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_traker', '0002_projectstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', 'id'], name='comment_task_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('private', False)), fields=['date_updated', 'id'], name='project_public_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'title'], name='task_project_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'deadline'], name='task_project_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'date_updated', 'id'], name='task_project_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'status'], name='task_executor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['date_created', 'id'], name='task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['date_updated', 'id'], name='task_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['deadline', 'id'], name='task_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['title', 'id'], name='task_title_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_hirings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='hiring',
+            constraint=models.UniqueConstraint(fields=('project', 'user'), name='hiring_project_user_unique'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE task_traker_task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{config}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{config}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX task_search_vector_idx ON task_traker_task USING GIN (search_vector)',
+    """
+    ALTER TABLE task_traker_comment ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('{config}', coalesce(text, ''))
+    ) STORED
+    """,
+    'CREATE INDEX comment_search_vector_idx ON task_traker_comment USING GIN (search_vector)',
+]
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS comment_search_vector_idx',
+    'ALTER TABLE task_traker_comment DROP COLUMN IF EXISTS search_vector',
+    'DROP INDEX IF EXISTS task_search_vector_idx',
+    'ALTER TABLE task_traker_task DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE task_traker_task_search USING fts5(
+        title, description, content='task_traker_task', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER task_traker_task_search_insert AFTER INSERT ON task_traker_task BEGIN
+        INSERT INTO task_traker_task_search (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_traker_task_search_delete AFTER DELETE ON task_traker_task BEGIN
+        INSERT INTO task_traker_task_search (task_traker_task_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_traker_task_search_update AFTER UPDATE OF title, description ON task_traker_task BEGIN
+        INSERT INTO task_traker_task_search (task_traker_task_search, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_traker_task_search (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO task_traker_task_search (task_traker_task_search) VALUES ('rebuild')",
+    """
+    CREATE VIRTUAL TABLE task_traker_comment_search USING fts5(
+        text, content='task_traker_comment', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER task_traker_comment_search_insert AFTER INSERT ON task_traker_comment BEGIN
+        INSERT INTO task_traker_comment_search (rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER task_traker_comment_search_delete AFTER DELETE ON task_traker_comment BEGIN
+        INSERT INTO task_traker_comment_search (task_traker_comment_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER task_traker_comment_search_update AFTER UPDATE OF text ON task_traker_comment BEGIN
+        INSERT INTO task_traker_comment_search (task_traker_comment_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO task_traker_comment_search (rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO task_traker_comment_search (task_traker_comment_search) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS task_traker_comment_search_update',
+    'DROP TRIGGER IF EXISTS task_traker_comment_search_delete',
+    'DROP TRIGGER IF EXISTS task_traker_comment_search_insert',
+    'DROP TABLE IF EXISTS task_traker_comment_search',
+    'DROP TRIGGER IF EXISTS task_traker_task_search_update',
+    'DROP TRIGGER IF EXISTS task_traker_task_search_delete',
+    'DROP TRIGGER IF EXISTS task_traker_task_search_insert',
+    'DROP TABLE IF EXISTS task_traker_task_search',
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        statements_for_vendor = statements.get(schema_editor.connection.vendor, [])
+        for statement in statements_for_vendor:
+            schema_editor.execute(statement.format(config=settings.SEARCH_CONFIG))
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_traker', '0004_outgoingmail'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_statements({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:20
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_traker', '0005_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('project', 'Проект'), ('task', 'Задача'), ('hiring', 'Участник'), ('comment', 'Комментарий')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('project_id', models.BigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('created', 'Создан'), ('updated', 'Изменён'), ('deleted', 'Удалён')], max_length=20)),
+                ('date_created', models.DateTimeField(default=datetime.datetime.today)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project_id', 'id'], name='change_project_idx'), models.Index(fields=['date_created'], name='change_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_traker', '0006_change'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='projectstats',
+            name='deadline_tasks',
+        ),
+    ]
@@ -2,6 +2,7 @@ import datetime
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, Q
 
 CustomUser = get_user_model()
 
@@ -25,6 +26,11 @@ class Project(models.Model):
         max_length=100,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_updated', 'id'], condition=Q(private=False), name='project_public_updated_idx'),
+        ]
+
     def __str__(self):
         return str(self.title)
 
@@ -43,6 +49,11 @@ class Hiring(models.Model):
         max_length=100
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user'], name='hiring_project_user_unique'),
+        ]
+
 
 class Task(models.Model):
     title = models.CharField(max_length=100)
@@ -81,10 +92,162 @@ class Task(models.Model):
     deadline = models.DateTimeField(default=datetime.datetime.today)
     tester = models.CharField(max_length=1000, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'title'], name='task_project_title_idx'),
+            models.Index(fields=['project', 'deadline'], name='task_project_deadline_idx'),
+            models.Index(fields=['project', 'date_updated', 'id'], name='task_project_updated_idx'),
+            models.Index(fields=['executor', 'status'], name='task_executor_status_idx'),
+            models.Index(fields=['date_created', 'id'], name='task_created_idx'),
+            models.Index(fields=['date_updated', 'id'], name='task_updated_idx'),
+            models.Index(fields=['deadline', 'id'], name='task_deadline_idx'),
+            models.Index(fields=['title', 'id'], name='task_title_idx'),
+        ]
+
     def __str__(self):
         return f'{self.title} - {self.description}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Проект, в котором задача сохранена в базе: при переносе в другой проект сигналы обновляют и прежний.
+        instance._saved_project_id = instance.__dict__.get('project_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_project_id = self.project_id
+
 
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
     text = models.CharField(max_length=500)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'id'], name='comment_task_idx'),
+        ]
+
+
+class ProjectStats(models.Model):
+    """
+    Денормализованная статистика проекта: число задач и число задач по статусам. Пересчитывается при каждом
+    изменении задач проекта, поэтому чтение статистики — это чтение одной строки.
+
+    Задачи с близким дедлайном (в ближайшие `DEADLINE_DAYS` дня) зависят от текущего времени, а не только от
+    изменений задач, поэтому не хранятся, а выбираются при чтении (`get_deadline_tasks`).
+    """
+    DEADLINE_DAYS = 3
+
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='stats',
+    )
+    value_tasks = models.PositiveIntegerField(default=0)
+    statuses = models.JSONField(default=dict)
+    date_updated = models.DateTimeField(default=datetime.datetime.today)
+
+    @classmethod
+    def calculate(cls, project_id):
+        tasks = Task.objects.filter(project_id=project_id)
+        statuses = {
+            i['status']: i['value'] for i in tasks.order_by().values('status').annotate(value=Count('id'))
+        }
+        return {
+            'value_tasks': sum(statuses.values()),
+            'statuses': statuses,
+            'date_updated': datetime.datetime.today(),
+        }
+
+    @classmethod
+    def get_deadline_range(cls):
+        today = datetime.datetime.today()
+        return today, today + datetime.timedelta(days=cls.DEADLINE_DAYS)
+
+    @classmethod
+    def get_deadline_tasks(cls, project_id):
+        """Названия задач проекта с дедлайном в ближайшие `DEADLINE_DAYS` дня (индекс `task_project_deadline_idx`)."""
+        return list(
+            Task.objects.filter(project_id=project_id, deadline__range=cls.get_deadline_range())
+            .order_by('id').values_list('title', flat=True)
+        )
+
+    @classmethod
+    def refresh(cls, project_id):
+        cls.objects.filter(project_id=project_id).update(**cls.calculate(project_id))
+
+    @classmethod
+    def rebuild(cls, project_id):
+        cls.objects.update_or_create(project_id=project_id, defaults=cls.calculate(project_id))
+
+
+class OutgoingMail(models.Model):
+    """
+    Письмо в очереди на отправку. Письма ставятся в очередь внутри запроса (`task_traker.mail.queue_mail`) и
+    отправляются фоновым обработчиком `send_mail_outbox` пачками через одно SMTP-соединение.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(
+        default='pending',
+        choices=[
+            ('pending', 'В очереди'),
+            ('sent', 'Отправлено'),
+            ('failed', 'Не отправлено'),
+        ],
+        max_length=100,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    date_created = models.DateTimeField(default=datetime.datetime.today)
+    next_attempt_at = models.DateTimeField(default=datetime.datetime.today)
+    date_sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='mail_status_next_attempt_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} - {", ".join(self.recipients)}'
+
+
+class Change(models.Model):
+    """
+    Запись журнала изменений для ленты синхронизации (`ChangesView`). Записи добавляются обработчиками сигналов и
+    массовыми операциями (`task_traker.changes`); `id` записи служит курсором клиента. Для удалённых объектов
+    запись остаётся «надгробием», поэтому `object_id` и `project_id` хранятся без внешних ключей.
+    """
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(
+        choices=[
+            ('project', 'Проект'),
+            ('task', 'Задача'),
+            ('hiring', 'Участник'),
+            ('comment', 'Комментарий'),
+        ],
+        max_length=20,
+    )
+    object_id = models.BigIntegerField()
+    project_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(
+        choices=[
+            ('created', 'Создан'),
+            ('updated', 'Изменён'),
+            ('deleted', 'Удалён'),
+        ],
+        max_length=20,
+    )
+    date_created = models.DateTimeField(default=datetime.datetime.today)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project_id', 'id'], name='change_project_idx'),
+            models.Index(fields=['date_created'], name='change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id} {self.action}'
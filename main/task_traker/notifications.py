@@ -0,0 +1,206 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_GROUP = 'notification_{}'
+PROJECT_GROUP = 'project_{}'
+
+
+def get_group_name(pk):
+    return NOTIFICATION_GROUP.format(pk)
+
+
+def get_project_group_name(pk):
+    return PROJECT_GROUP.format(pk)
+
+
+async def _group_send_all(events):
+    channel_layer = get_channel_layer()
+    for group, event in events:
+        # `sent_at` — начало доставки, по нему потребители считают задержку (`websoket.metrics`).
+        await channel_layer.group_send(group, {**event, 'sent_at': time.time()})
+
+
+class Delivery:
+    """
+    Отправка пачек уведомлений в слой каналов из фонового потока процесса, чтобы колбэк `on_commit` не держал
+    ответ на запрос, пока слой каналов (например, `DatabaseChannelLayer`) принимает сообщения. Поток один,
+    поэтому пачки уходят в порядке коммитов. Очередь ограничена `NOTIFICATION_QUEUE_SIZE`: если слой каналов не
+    успевает, новые пачки отбрасываются с предупреждением, а не копятся в памяти. При выходе процесса очередь
+    дописывается. `NOTIFICATION_DELIVERY_THREAD=False` отправляет пачку сразу в колбэке, как раньше.
+    """
+
+    def __init__(self):
+        self.queue = None
+        self.lock = threading.Lock()
+        self.pid = None
+        self.thread = None
+
+    def start(self):
+        """Фоновый поток для текущего процесса; после `fork` очередь и поток создаются заново."""
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(settings.NOTIFICATION_QUEUE_SIZE)
+            self.thread = threading.Thread(target=self.run, args=(self.queue,), name='notifications', daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+        atexit.register(self.stop)
+
+    def run(self, events_queue):
+        while True:
+            events = events_queue.get()
+            try:
+                if events is None:
+                    return
+                self.send(events)
+                # Соединения потока нужны `DatabaseChannelLayer` только на время отправки.
+                connections.close_all()
+            finally:
+                events_queue.task_done()
+
+    def send(self, events):
+        try:
+            async_to_sync(_group_send_all)(events)
+        except Exception:
+            logger.exception('Не удалось отправить уведомления в слой каналов')
+
+    def put(self, events):
+        if not settings.NOTIFICATION_DELIVERY_THREAD:
+            self.send(events)
+            return
+        self.start()
+        try:
+            self.queue.put_nowait(events)
+        except queue.Full:
+            logger.warning('Очередь уведомлений переполнена, пачка из %s событий отброшена', len(events))
+
+    def wait(self):
+        """Ждёт, пока поток отправит всё, что уже стоит в очереди."""
+        if self.pid == os.getpid():
+            self.queue.join()
+
+    def stop(self, timeout=5):
+        if self.pid != os.getpid():
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+
+delivery = Delivery()
+
+
+def _deliver(events):
+    if events:
+        delivery.put(events)
+
+
+class NotificationBatch:
+    """
+    Уведомления одной транзакции. Копятся в памяти и отправляются в слой каналов одним проходом после коммита.
+    Пачка относится к одной точке сохранения: при откате транзакции или точки сохранения Django отбрасывает
+    колбэк `flush`, и уведомления пропадают вместе с изменениями.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.flushed = False
+
+    def add(self, group, event):
+        self.events.append((group, event))
+
+    def flush(self):
+        events, self.events = self.events, []
+        self.flushed = True
+        _deliver(events)
+
+
+def _get_batch(connection):
+    """
+    Открытая пачка текущей точки сохранения: колбэк последней пачки, если после него не было других колбэков
+    и точка сохранения та же. Иначе — `None`, и уведомление начинает новую пачку, чтобы порядок отправки
+    совпадал с порядком событий.
+    """
+    if not connection.in_atomic_block or not connection.run_on_commit:
+        return None
+    sids, func, _ = connection.run_on_commit[-1]
+    batch = getattr(func, '__self__', None)
+    if isinstance(batch, NotificationBatch) and not batch.flushed and sids == set(connection.savepoint_ids):
+        return batch
+    return None
+
+
+def publish(group, event, using=None):
+    """
+    Отправляет событие в группу после коммита текущей транзакции (`transaction.on_commit`); вне транзакции
+    колбэк выполняется сразу. Сам колбэк только ставит пачку в очередь `delivery`, в слой каналов её отправляет
+    фоновый поток.
+    """
+    batch = _get_batch(transaction.get_connection(using))
+    if batch is None:
+        batch = NotificationBatch()
+        batch.add(group, event)
+        transaction.on_commit(batch.flush, using=using, robust=True)
+    else:
+        batch.add(group, event)
+
+
+def send_message(pk, message):
+    if pk is None:
+        return
+    publish(
+        get_group_name(pk),
+        {
+            'type': 'notification.message',
+            'message': message,
+        },
+    )
+
+
+def send_task_event(project_id, action, task_id, data=None):
+    """
+    Событие задачи для подписчиков проекта (`ProjectConsumer`): `action` — `created`, `updated` или `deleted`,
+    `data` — сериализованная задача при создании и только изменившиеся поля при обновлении.
+    """
+    publish(
+        get_project_group_name(project_id),
+        {
+            'type': 'task.event',
+            'action': action,
+            'task': task_id,
+            'data': data,
+        },
+    )
+
+
+def send_task_events(project_id, action, tasks):
+    """
+    События массовой операции над задачами одного проекта одним сообщением группы: `tasks` — пары
+    «идентификатор задачи, данные», как у `send_task_event`. Сообщение в слой каналов одно, сколько бы задач
+    ни изменилось, поэтому большая пачка не переполняет очередь подписчика.
+    """
+    if not tasks:
+        return
+    publish(
+        get_project_group_name(project_id),
+        {
+            'type': 'task.events',
+            'action': action,
+            'tasks': [{'task': task_id, 'data': data} for task_id, data in tasks],
+        },
+    )
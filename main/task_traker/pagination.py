@@ -0,0 +1,156 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по индексируемым полям сортировки.
+
+    Страница выбирается условием на значения полей сортировки последней (или первой) записи предыдущей страницы,
+    поэтому стоимость запроса не зависит от глубины страницы. Порядок берётся из `order_by` выборки, затем из
+    атрибута `ordering` представления; поле `id` всегда добавляется последним, чтобы порядок был строгим.
+
+    Тело ответа остаётся списком, а курсоры передаются в заголовках `Link`, `X-Next-Cursor` и `X-Previous-Cursor`.
+    Асинхронные представления читают страницу через `apaginate_queryset`.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 1000
+    ordering = ('id',)
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.get_page([i async for i in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.values, self.reverse = self.decode_cursor(request)
+
+        if self.values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.values, self.reverse))
+        ordering = [self.reverse_field(i) for i in self.ordering] if self.reverse else self.ordering
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def get_page(self, results):
+        values, reverse = self.values, self.reverse
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if results and (has_more or reverse):
+            self.next_cursor = self.encode_cursor(results[-1], reverse=False)
+        if results and values is not None and (has_more or not reverse):
+            self.previous_cursor = self.encode_cursor(results[0], reverse=True)
+        return results
+
+    def get_paginated_response(self, data):
+        headers = {}
+        links = []
+        if self.next_cursor is not None:
+            headers['X-Next-Cursor'] = self.next_cursor
+            links.append(f'<{self.get_link(self.next_cursor)}>; rel="next"')
+        if self.previous_cursor is not None:
+            headers['X-Previous-Cursor'] = self.previous_cursor
+            links.append(f'<{self.get_link(self.previous_cursor)}>; rel="prev"')
+        if links:
+            headers['Link'] = ', '.join(links)
+        return Response(data=data, status=200, headers=headers)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = list(queryset.query.order_by or getattr(view, 'ordering', None) or self.ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+
+    @staticmethod
+    def reverse_field(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_keyset_filter(self, values, reverse):
+        keyset = Q()
+        for n, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            condition = Q(**{f'{field.lstrip("-")}__{"lt" if descending else "gt"}': values[n]})
+            for previous, value in zip(self.ordering[:n], values[:n]):
+                condition &= Q(**{previous.lstrip('-'): value})
+            keyset |= condition
+        return keyset
+
+    @staticmethod
+    def encode_value(value):
+        # `DjangoJSONEncoder` отбрасывает микросекунды, и условие по соседним записям с одинаковыми секундами
+        # пропускало или повторяло строки, поэтому время хранится полностью.
+        if isinstance(value, datetime.datetime):
+            return {'dt': value.isoformat(timespec='microseconds')}
+        return value
+
+    @staticmethod
+    def decode_value(value):
+        if isinstance(value, dict):
+            return datetime.datetime.fromisoformat(value['dt'])
+        return value
+
+    def encode_cursor(self, instance, reverse):
+        values = [self.encode_value(getattr(instance, i.lstrip('-'))) for i in self.ordering]
+        data = json.dumps({'v': values, 'r': reverse}, cls=DjangoJSONEncoder)
+        return urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(cursor.encode()))
+            values, reverse = data['v'], bool(data['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            values = [self.decode_value(i) for i in values]
+        except (BinasciiError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def get_link(self, cursor):
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'integer'},
+            },
+        ]
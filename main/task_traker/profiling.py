@@ -0,0 +1,213 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+_profile = ContextVar('profile', default=None)
+
+AUTH_QUERIES = 1
+
+
+class RequestProfile:
+    """Замеры одного запроса: число и время SQL-запросов, время сериализации и отрисовки ответа, в секундах."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+        self.serialize_time = 0
+        self.render_time = 0
+        self.render_started = None
+        self.serialize_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def get_query_budget(view_class, method):
+    """
+    Бюджет SQL-запросов представления: атрибут `query_budget` — число для всех методов или словарь
+    «метод → число». `None`, если бюджет не задан.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget
+
+
+def _profiled_data(data):
+    # Время считается только у внешнего сериализатора: вложенные (`ProjectSerializer.get_tasks`) входят в него.
+    def wrapper(self):
+        profile = _profile.get()
+        if profile is None or profile.serialize_depth:
+            return data.fget(self)
+        profile.serialize_depth += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            profile.serialize_depth -= 1
+            profile.serialize_time += time.perf_counter() - started
+    return property(wrapper)
+
+
+class SerializerTimer:
+    """
+    Замер `serializer.data` только на время профилируемых запросов: обёртка ставится на `BaseSerializer.data` при
+    входе первого запроса и снимается после выхода последнего, поэтому вне профилирования DRF работает без неё.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.original = None
+
+    def __enter__(self):
+        with self.lock:
+            if not self.active:
+                self.original = BaseSerializer.__dict__['data']
+                BaseSerializer.data = _profiled_data(self.original)
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.active -= 1
+            if not self.active:
+                BaseSerializer.data = self.original
+
+
+serializer_timer = SerializerTimer()
+
+
+class ProfilingMiddleware:
+    """
+    Профилировщик запросов. Включается только явно: `PROFILING_ENABLED=True` добавляет его в начало `MIDDLEWARE`.
+
+    Для каждого запроса считает SQL-запросы и их время (через `execute_wrapper` всех подключений), время
+    сериализации (`serializer.data` внешних сериализаторов через `serializer_timer` на время запроса, включая
+    запросы, которые делает сама сериализация — признак N+1) и отрисовки ответа, добавляет их в заголовок
+    `Server-Timing` и пишет одной JSON-строкой в лог `task_traker.profiling`. Запросы, у которых число SQL-запросов
+    больше `PROFILING_QUERY_THRESHOLD` или бюджета представления (`query_budget`), или время больше
+    `PROFILING_LATENCY_THRESHOLD` миллисекунд, пишутся с уровнем WARNING и флагами `queries` / `budget` /
+    `latency`. Бюджет не включает запрос пользователя при аутентификации по токену. Потоковые ответы
+    сериализуются после выхода из представления, поэтому для них учитывается только подготовка ответа.
+    Работает и в синхронной, и в асинхронной цепочке middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            with serializer_timer, self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        # Асинхронный ORM выполняет запросы в потоке `sync_to_async` со своими подключениями к базе,
+        # поэтому обёртки ставятся и снимаются в этом потоке.
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        stack = await sync_to_async(self.wrap_connections)(profile)
+        try:
+            with serializer_timer:
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _profile.reset(token)
+        return self.finish(request, response, profile)
+
+    @staticmethod
+    def wrap_connections(profile):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+        return stack
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        response['Server-Timing'] = self.get_server_timing(profile, total)
+        self.log(request, response, profile, total)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = _profile.get()
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self.rendered(profile))
+        return response
+
+    @staticmethod
+    def rendered(profile):
+        profile.render_time += time.perf_counter() - profile.render_started
+
+    @staticmethod
+    def get_server_timing(profile, total):
+        return ', '.join([
+            f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"',
+            f'serialize;dur={profile.serialize_time * 1000:.1f}',
+            f'render;dur={profile.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    @staticmethod
+    def get_budget(request):
+        match = getattr(request, 'resolver_match', None)
+        view_class = getattr(match.func, 'view_class', None) if match is not None else None
+        budget = get_query_budget(view_class, request.method)
+        if budget is not None and getattr(request, 'auth', None) is not None:
+            # JWTAuthentication загружает пользователя токена отдельным запросом.
+            budget += AUTH_QUERIES
+        return budget
+
+    def log(self, request, response, profile, total):
+        flags = []
+        budget = self.get_budget(request)
+        if profile.queries > settings.PROFILING_QUERY_THRESHOLD:
+            flags.append('queries')
+        if budget is not None and profile.queries > budget:
+            flags.append('budget')
+        if total * 1000 > settings.PROFILING_LATENCY_THRESHOLD:
+            flags.append('latency')
+        logger.log(
+            logging.WARNING if flags else logging.INFO,
+            json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': profile.queries,
+                'budget': budget,
+                'db_ms': round(profile.db_time * 1000, 1),
+                'serialize_ms': round(profile.serialize_time * 1000, 1),
+                'render_ms': round(profile.render_time * 1000, 1),
+                'total_ms': round(total * 1000, 1),
+                'flags': flags,
+            }),
+        )
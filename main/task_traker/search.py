@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from .models import Comment, Task
+
+POSTGRESQL_QUERY = """
+    SELECT 'task' AS type, task.id, task.id AS task_id, task.project_id, task.title AS text,
+           ts_rank(task.search_vector, query) AS rank
+    FROM task_traker_task task, websearch_to_tsquery(%(config)s, %(query)s) query
+    WHERE task.search_vector @@ query {task_filter}
+    UNION ALL
+    SELECT 'comment' AS type, comment.id, comment.task_id, task.project_id, comment.text,
+           ts_rank(comment.search_vector, query) AS rank
+    FROM task_traker_comment comment
+    JOIN task_traker_task task ON task.id = comment.task_id,
+    websearch_to_tsquery(%(config)s, %(query)s) query
+    WHERE comment.search_vector @@ query {task_filter}
+    ORDER BY rank DESC, type DESC, id
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+SQLITE_QUERY = """
+    SELECT * FROM (
+        SELECT 'task' AS type, task.id, task.id AS task_id, task.project_id, task.title AS text,
+               -bm25(task_traker_task_search, 2.0, 1.0) AS rank
+        FROM task_traker_task_search
+        JOIN task_traker_task task ON task.id = task_traker_task_search.rowid
+        WHERE task_traker_task_search MATCH %(query)s {task_filter}
+        UNION ALL
+        SELECT 'comment' AS type, comment.id, comment.task_id, task.project_id, comment.text,
+               -bm25(task_traker_comment_search) AS rank
+        FROM task_traker_comment_search
+        JOIN task_traker_comment comment ON comment.id = task_traker_comment_search.rowid
+        JOIN task_traker_task task ON task.id = comment.task_id
+        WHERE task_traker_comment_search MATCH %(query)s {task_filter}
+    )
+    ORDER BY rank DESC, type DESC, id
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+
+def to_fts5_query(query):
+    # Каждое слово экранируется как фраза с поиском по префиксу, чтобы ввод пользователя не разбирался как синтаксис FTS5.
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in query.split())
+
+
+def search_icontains(query, project_id=None, limit=50, offset=0):
+    """
+    Поиск без полнотекстового индекса для баз данных, кроме PostgreSQL и SQLite: подстрока `query` без учёта
+    регистра в названиях и описаниях задач и текстах комментариев. Совпадение в названии задачи весит больше,
+    чем в описании; порядок результатов тот же, что у `search`. Задачи и комментарии выбираются одним запросом
+    (`UNION ALL`), но индексы не используются, поэтому это запасной вариант, а не замена полнотекстового поиска.
+    """
+    tasks = Task.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    comments = Comment.objects.filter(text__icontains=query)
+    if project_id is not None:
+        tasks = tasks.filter(project_id=project_id)
+        comments = comments.filter(task__project_id=project_id)
+    # Оба запроса выбирают одни и те же столбцы в одном порядке, чтобы объединить их в один `UNION ALL`.
+    tasks = tasks.annotate(
+        result_type=Value('task'),
+        result_task=F('id'),
+        result_project=F('project_id'),
+        result_text=F('title'),
+        rank=Case(When(title__icontains=query, then=Value(2.0)), default=Value(1.0), output_field=FloatField()),
+    ).values_list('result_type', 'id', 'result_task', 'result_project', 'result_text', 'rank')
+    comments = comments.annotate(
+        result_type=Value('comment'),
+        result_task=F('task_id'),
+        result_project=F('task__project_id'),
+        result_text=F('text'),
+        rank=Value(1.0, output_field=FloatField()),
+    ).values_list('result_type', 'id', 'result_task', 'result_project', 'result_text', 'rank')
+    rows = tasks.union(comments, all=True).order_by('-rank', '-result_type', 'id')[offset:offset + limit]
+    return [
+        dict(zip(('type', 'id', 'task_id', 'project_id', 'text', 'rank'), row))
+        for row in rows
+    ]
+
+
+def search(query, project_id=None, limit=50, offset=0):
+    """
+    Полнотекстовый поиск по названиям и описаниям задач и текстам комментариев.
+
+    На PostgreSQL используются столбцы `search_vector` (tsvector с GIN-индексами), на SQLite — таблицы FTS5;
+    и те и другие обновляются базой данных при записи. На других базах — `search_icontains`. Возвращает список словарей с типом (`task` или `comment`),
+    идентификатором, задачей, проектом, текстом и релевантностью, отсортированный по убыванию релевантности.
+    """
+    if not query.strip():
+        return []
+    if connection.vendor == 'postgresql':
+        sql = POSTGRESQL_QUERY
+    elif connection.vendor == 'sqlite':
+        sql = SQLITE_QUERY
+        query = to_fts5_query(query)
+    else:
+        return search_icontains(query, project_id, limit, offset)
+
+    params = {
+        'config': settings.SEARCH_CONFIG,
+        'query': query,
+        'limit': limit,
+        'offset': offset,
+    }
+    task_filter = ''
+    if project_id is not None:
+        task_filter = 'AND task.project_id = %(project_id)s'
+        params['project_id'] = project_id
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(task_filter=task_filter), params)
+        columns = [i[0] for i in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,115 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.models import ProjectHistory
+from .models import Comment, CustomUser, Hiring, Project, ProjectStats, Task
+
+# Доли статусов задач: больше всего задач в работе и завершённых, как на живой доске.
+STATUSES = {
+    'grooming': 0.2,
+    'in_progress': 0.35,
+    'dev': 0.15,
+    'done': 0.3,
+}
+PRIORITIES = {
+    0: 0.5,
+    1: 0.35,
+    2: 0.15,
+}
+ROLES = ('programmer', 'tester', 'manager', 'designer')
+WORDS = (
+    'отчёт', 'сервер', 'авторизация', 'интерфейс', 'база', 'данные', 'релиз', 'тест', 'ошибка', 'оплата',
+    'профиль', 'поиск', 'уведомления', 'документация', 'миграция', 'кэш', 'api', 'deploy', 'login', 'build',
+)
+BATCH_SIZE = 1000
+
+
+def get_text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def get_deadline(rng, today):
+    # Большая часть сроков — в ближайший месяц, часть уже просрочена.
+    return today + datetime.timedelta(days=rng.randint(-10, 30), hours=rng.randint(0, 23))
+
+
+def seed(projects=10, users=20, members=5, tasks=20, comments=2, private=0.1, seed=0):
+    """
+    Заполняет базу синтетическими данными массовыми вставками: `users` пользователей, `projects` проектов
+    (доля `private` приватных) по `members` участников и `tasks` задач в каждом, `comments` комментариев в среднем
+    на задачу. Статусы, приоритеты и сроки задач распределены как на живой доске (`STATUSES`, `PRIORITIES`).
+    Статистика проектов пересчитывается после вставки. Возвращает число созданных объектов по типам.
+    """
+    rng = random.Random(seed)
+    today = datetime.datetime.today()
+    prefix = f'seed{seed}-{int(today.timestamp())}'
+    password = make_password('password')
+
+    with transaction.atomic():
+        created_users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f'{prefix}-user{n}@example.com',
+                    email=f'{prefix}-user{n}@example.com',
+                    first_name=f'User {n}',
+                    password=password,
+                ) for n in range(users)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        created_projects = Project.objects.bulk_create(
+            [
+                Project(
+                    title=f'Project {n} {get_text(rng, 2)}',
+                    description=get_text(rng, 12),
+                    private=rng.random() < private,
+                    date_updated=today - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                ) for n in range(projects)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        hirings, history, project_members = [], [], {}
+        for project in created_projects:
+            project_members[project.id] = rng.sample(created_users, min(members, len(created_users)))
+            for user in project_members[project.id]:
+                hirings.append(Hiring(project=project, user=user, role_in_project=rng.choice(ROLES)))
+                history.append(ProjectHistory(project=project, user=user, title=project.title))
+        Hiring.objects.bulk_create(hirings, batch_size=BATCH_SIZE)
+        ProjectHistory.objects.bulk_create(history, batch_size=BATCH_SIZE)
+
+        created_tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    title=f'Task {n} {get_text(rng, 3)}',
+                    description=get_text(rng, 20),
+                    project=project,
+                    executor=rng.choice(project_members[project.id]) if project_members[project.id] else None,
+                    status=rng.choices(list(STATUSES), weights=list(STATUSES.values()))[0],
+                    priority=rng.choices(list(PRIORITIES), weights=list(PRIORITIES.values()))[0],
+                    deadline=get_deadline(rng, today),
+                    date_updated=today - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                ) for project in created_projects for n in range(tasks)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        created_comments = Comment.objects.bulk_create(
+            [
+                Comment(task=task, text=get_text(rng, 10))
+                for task in created_tasks for _ in range(rng.randint(0, comments * 2))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for project in created_projects:
+            ProjectStats.rebuild(project.id)
+
+    return {
+        'users': len(created_users),
+        'projects': len(created_projects),
+        'hirings': len(hirings),
+        'tasks': len(created_tasks),
+        'comments': len(created_comments),
+    }
@@ -1,27 +1,22 @@
-import json
-from collections import Counter
 from datetime import datetime
-from smtplib import SMTPSenderRefused
 
-from django.core.mail import send_mail
-from django.db.utils import ProgrammingError, OperationalError
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework.exceptions import ValidationError
-from websocket import create_connection
-
-from .models import CustomUser, Project, Task, Hiring, Comment
+from rest_framework.reverse import reverse
+
+from accounts.models import ProjectHistory
+from .cache import bump_project_version
+from .changes import record_changes
+from .fields import LinkedPkField, UserChoiceField
+from .mail import queue_mail
+from .models import CustomUser, Project, Task, Hiring, Comment, ProjectStats, Change
+from .notifications import send_message, send_task_event, send_task_events
 from rest_framework import serializers
 
 from main import settings
 
 
-def send_message(pk, message):
-    try:
-        ws = create_connection(f"ws://127.0.0.1:8001/ws/msg/{pk}/")
-        ws.send(json.dumps({'message': message}))
-    except ConnectionRefusedError:
-        pass
-
-
 class ProjectSerializer(serializers.ModelSerializer):
     tasks = serializers.SerializerMethodField(read_only=True)
     users = serializers.SlugRelatedField(
@@ -58,38 +53,48 @@ class ProjectSerializer(serializers.ModelSerializer):
         }
 
     @staticmethod
-    def get_statistic(obj):
-        tasks = Task.objects.filter(project_id=obj.id)
-        statistics = {
-            'value_tasks': len(tasks),
-            'deadline_tasks': [i.title for i in tasks if datetime.today().day - i.deadline.day <= 3]
-        }
-        statistics['statuses'] = {
-            i: f'{round(n / statistics["value_tasks"] * 100, 2)}%' for i, n in Counter(
-                [
-                    i.status for i in tasks
-                ]
-            ).items()
-        }
+    def setup_eager_loading(queryset):
+        """
+        Подгружает статистику, задачи и участников всех проектов выборки фиксированным числом запросов,
+        чтобы `get_tasks`, `get_statistic` и `get_user_roles` работали из памяти. Задачи с близким дедлайном
+        `get_statistic` отбирает из загруженных задач на момент чтения.
+        """
+        return queryset.select_related('stats').prefetch_related(
+            Prefetch('task_set', queryset=Task.objects.order_by('id')),
+            Prefetch('hiring_set', queryset=Hiring.objects.select_related('user').order_by('id')),
+        )
 
-        return statistics
+    @staticmethod
+    def get_deadline_tasks(obj):
+        if 'task_set' not in getattr(obj, '_prefetched_objects_cache', {}):
+            return ProjectStats.get_deadline_tasks(obj.id)
+        start, end = ProjectStats.get_deadline_range()
+        return [i.title for i in obj.task_set.all() if start <= i.deadline <= end]
+
+    def get_statistic(self, obj):
+        try:
+            stats = obj.stats
+        except ProjectStats.DoesNotExist:
+            stats = ProjectStats(project=obj)
+        return {
+            'value_tasks': stats.value_tasks,
+            'deadline_tasks': self.get_deadline_tasks(obj),
+            'statuses': {
+                i: f'{round(n / stats.value_tasks * 100, 2)}%' for i, n in stats.statuses.items() if n
+            },
+        }
 
     def get_tasks(self, obj):
-        return [
-            TaskSerializer(
-                instance=task,
-                context=self.context
-            ).data for task in Task.objects.filter(
-                project=obj
-            )
-        ] or ['нет текущих  заданий']
+        return TaskSerializer(
+            obj.task_set.all(),
+            many=True,
+            context=self.context,
+        ).data or ['нет текущих  заданий']
 
     @staticmethod
     def get_user_roles(obj):
         return [
-            f'{i.user.first_name} - {i.user.email} - {i.role_in_project}' for i in Hiring.objects.filter(
-                project=obj,
-            )
+            f'{i.user.first_name} - {i.user.email} - {i.role_in_project}' for i in obj.hiring_set.all()
         ]
 
     def get_fields(self):
@@ -106,25 +111,33 @@ class ProjectSerializer(serializers.ModelSerializer):
         return fields
 
     def update(self, instance, validated_data):
-        for i in validated_data['users']:
+        users = validated_data.get('users', [])
+        if users:
             title = validated_data.get('title', instance.title)
-            if title not in json.loads(i.history):
-                i.history = json.dumps([*json.loads(i.history), title])
-                try:
-                    send_mail(
-                        'Оповщения о включении в проект',
-                        f'Вас включили в проект {title} в {datetime.today().strftime("%d-%m-%Y %H:%M")} по МСК',
-                        settings.EMAIL_HOST_USER,
-                        ['Ravil.Mirgayazov@yandex.ru']
-                    )
-                except SMTPSenderRefused:
-                    pass
+            joined = set(
+                ProjectHistory.objects.filter(
+                    project=instance,
+                    user__in=users,
+                ).values_list('user_id', flat=True)
+            )
+            new_users = [i for i in users if i.id not in joined]
+            ProjectHistory.objects.bulk_create(
+                [ProjectHistory(user=i, project=instance, title=title) for i in new_users],
+                ignore_conflicts=True,
+            )
+            for i in new_users:
+                queue_mail(
+                    'Оповщения о включении в проект',
+                    f'Вас включили в проект {title} в {datetime.today().strftime("%d-%m-%Y %H:%M")} по МСК',
+                    settings.EMAIL_HOST_USER,
+                    [i.email],
+                )
                 send_message(i.id, 'Вас добавили в новый проект')
-                i.save()
         return super().update(instance, validated_data)
 
     def create(self, validated_data):
-        return self.update(super().create(validated_data), validated_data)
+        users = validated_data.get('users', [])
+        return self.update(super().create(validated_data), {**validated_data, 'users': users})
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -136,14 +149,12 @@ class TaskSerializer(serializers.ModelSerializer):
         )
     )
 
-    try:
-        tester = serializers.ChoiceField(
-            choices=[(str(i.id), f'{i.first_name} {i.email}') for i in CustomUser.objects.all()], required=False
-        )
-    except OperationalError:
-        pass
-    except ProgrammingError:
-        pass
+    tester = UserChoiceField(
+        cache_name='tester',
+        queryset=CustomUser.objects.all(),
+        label_field=lambda user: f'{user.first_name} {user.email}',
+        required=False,
+    )
 
     class Meta:
         model = Task
@@ -168,17 +179,25 @@ class TaskSerializer(serializers.ModelSerializer):
             'deadline',
         ]
 
+    def create(self, validated_data):
+        obj = super().create(validated_data)
+        send_task_event(obj.project_id, 'created', obj.id, self.to_representation(obj))
+        return obj
+
     def update(self, instance, validated_data):
-        try:
-            if instance.status != validated_data['status']:
-                obj = super().update(instance, validated_data)
-                send_message(
-                    instance.id,
-                    f'Статус вашей задачи {instance.title} изменён на {validated_data["sttatus"]}'
-                )
-                return obj
-        except KeyError:
-            return super().update(instance, validated_data)
+        status_changed = 'status' in validated_data and instance.status != validated_data['status']
+        # Значения сравниваются в представлении: в модели и в `validated_data` они могут быть разных типов.
+        before = self.to_representation(instance)
+        obj = super().update(instance, {**validated_data, 'date_updated': datetime.today()})
+        if status_changed:
+            send_message(
+                instance.executor_id,
+                f'Статус вашей задачи {instance.title} изменён на {instance.status}'
+            )
+        data = self.to_representation(obj)
+        changed = [i for i in validated_data if i in data and data[i] != before.get(i)]
+        send_task_event(obj.project_id, 'updated', obj.id, {i: data[i] for i in [*changed, 'date_updated']})
+        return obj
 
     def validate_title(self, attr):
         if Task.objects.filter(title=attr, project_id=self.initial_data['project'].split('/')[-1]):
@@ -186,19 +205,21 @@ class TaskSerializer(serializers.ModelSerializer):
         return attr
 
     def validate_executor(self, attr):
-        if attr in Project.objects.filter(pk=self.initial_data['project'].split('/')[-1]).first().users.all():
+        if Hiring.objects.filter(project_id=self.initial_data['project'].split('/')[-1], user_id=attr.id).exists():
             send_message(
-                CustomUser.objects.filter(email=attr).first().id,
+                attr.id,
                 'Вы были назначены ответственным за выполнение задачи'
             )
             return attr
         raise ValidationError('Этот пользователь не включён в проект')
 
-    @staticmethod
-    def validate_tester(attrs):
-        tester = CustomUser.objects.filter(pk=attrs).first()
-        if tester in Project.objects.first().users.all():
-            return f'{tester.first_name} {tester.email}'
+    def validate_tester(self, attrs):
+        hiring = Hiring.objects.select_related('user').filter(
+            project_id=self.initial_data['project'].split('/')[-1],
+            user_id=attrs,
+        ).first()
+        if hiring is not None:
+            return f'{hiring.user.first_name} {hiring.user.email}'
         raise ValidationError('Этот пользователь не включён в проект')
 
     def get_fields(self):
@@ -236,9 +257,7 @@ class HiringSerializer(serializers.ModelSerializer):
         try:
             pk = self.context['request'].__dict__['parser_context']['kwargs']['pk']
             fields['user'].queryset = fields['user'].queryset.filter(
-                project=Project.objects.filter(
-                    pk=pk,
-                ).first(),
+                project=pk,
             )
         except KeyError:
             pass
@@ -290,24 +309,14 @@ class FilterTasksSerializer(serializers.Serializer):
             ('done', 'Done'),
         ]
     )
-    try:
-        executor_id = serializers.ChoiceField(
-            choices=[
-                (None, 'Any'),
-                *[
-                    (
-                        i.id,
-                        i.email,
-                    ) for i in CustomUser.objects.filter(
-                        is_staff=False,
-                    )
-                ],
-            ]
-        )
-    except OperationalError:
-        pass
-    except ProgrammingError:
-        pass
+    executor_id = UserChoiceField(
+        cache_name='executor',
+        queryset=CustomUser.objects.filter(
+            is_staff=False,
+        ),
+        label_field='email',
+        allow_any=True,
+    )
 
     sort_by = serializers.ChoiceField(
         choices=[
@@ -327,6 +336,186 @@ class FilterProjectsTasksSerializer(serializers.Serializer):
     deadline = serializers.DateTimeField(default=datetime.today)
 
 
+class BulkTaskItemSerializer(serializers.ModelSerializer):
+    executor = LinkedPkField()
+    tester = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Task
+        fields = [
+            'title',
+            'description',
+            'executor',
+            'status',
+            'priority',
+            'deadline',
+            'tester',
+        ]
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    project = serializers.HyperlinkedRelatedField(view_name='projects', queryset=Project.objects.all())
+    tasks = BulkTaskItemSerializer(many=True, allow_empty=False)
+
+    def validate_tasks(self, attrs):
+        if len(attrs) > settings.BULK_TASKS_MAX:
+            raise ValidationError(f'За один запрос можно создать не больше {settings.BULK_TASKS_MAX} задач')
+        return attrs
+
+    def validate(self, attrs):
+        project, tasks = attrs['project'], attrs['tasks']
+        titles = [i['title'] for i in tasks]
+        existing = set(Task.objects.filter(project=project, title__in=titles).values_list('title', flat=True))
+        members = {
+            i.user_id: i.user for i in Hiring.objects.select_related('user').filter(
+                project=project,
+                user_id__in={i['executor'] for i in tasks} | {i['tester'] for i in tasks if 'tester' in i},
+            )
+        }
+
+        errors = []
+        seen = set()
+        for task in tasks:
+            error = {}
+            if task['title'] in existing or task['title'] in seen:
+                error['title'] = ['Задача с таким названием уже существует']
+            if task['executor'] not in members:
+                error['executor'] = ['Этот пользователь не включён в проект']
+            if 'tester' in task and task['tester'] not in members:
+                error['tester'] = ['Этот пользователь не включён в проект']
+            seen.add(task['title'])
+            errors.append(error)
+        if any(errors):
+            raise ValidationError({'tasks': errors})
+
+        for task in tasks:
+            if 'tester' in task:
+                tester = members[task['tester']]
+                task['tester'] = f'{tester.first_name} {tester.email}'
+        return attrs
+
+    def create(self, validated_data):
+        project = validated_data['project']
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(
+                [
+                    Task(
+                        project=project,
+                        executor_id=task.pop('executor'),
+                        **task,
+                    ) for task in validated_data['tasks']
+                ]
+            )
+            ProjectStats.refresh(project.id)
+            bump_project_version(project.id)
+            record_changes('task', [(task.id, project.id) for task in tasks], 'created')
+            send_task_events(
+                project.id,
+                'created',
+                [(task.id, data) for task, data in zip(tasks, TaskSerializer(tasks, many=True, context=self.context).data)],
+            )
+            executors = {}
+            for task in tasks:
+                executors[task.executor_id] = executors.get(task.executor_id, 0) + 1
+            for executor_id, value in executors.items():
+                send_message(
+                    executor_id,
+                    f'Вы были назначены ответственным за выполнение задач проекта {project.title}: {value}'
+                )
+        return tasks
+
+
+class BulkTaskTransitionSerializer(serializers.Serializer):
+    tasks = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Task._meta.get_field('status').choices)
+    executor = LinkedPkField(required=False)
+    priority = serializers.ChoiceField(choices=Task._meta.get_field('priority').choices, required=False)
+
+    def validate_tasks(self, attrs):
+        if len(attrs) > settings.BULK_TASKS_MAX:
+            raise ValidationError(f'За один запрос можно изменить не больше {settings.BULK_TASKS_MAX} задач')
+        return list(set(attrs))
+
+    def validate(self, attrs):
+        self.instances = list(Task.objects.filter(pk__in=attrs['tasks']).values('id', 'project_id', 'executor_id'))
+        missing = set(attrs['tasks']) - {i['id'] for i in self.instances}
+        if missing:
+            raise ValidationError({'tasks': [f'Задачи не найдены: {", ".join(map(str, sorted(missing)))}']})
+        if 'executor' in attrs:
+            projects = {i['project_id'] for i in self.instances}
+            hired = set(
+                Hiring.objects.filter(
+                    user_id=attrs['executor'],
+                    project_id__in=projects,
+                ).values_list('project_id', flat=True)
+            )
+            if projects - hired:
+                raise ValidationError({'executor': ['Этот пользователь не включён в проект']})
+        return attrs
+
+    def save(self, **kwargs):
+        data = {
+            'status': self.validated_data['status'],
+            'date_updated': datetime.today(),
+        }
+        if 'executor' in self.validated_data:
+            data['executor_id'] = self.validated_data['executor']
+        if 'priority' in self.validated_data:
+            data['priority'] = self.validated_data['priority']
+
+        with transaction.atomic():
+            count = Task.objects.filter(pk__in=self.validated_data['tasks']).update(**data)
+            for project_id in {i['project_id'] for i in self.instances}:
+                ProjectStats.refresh(project_id)
+                bump_project_version(project_id)
+            record_changes('task', [(i['id'], i['project_id']) for i in self.instances], 'updated')
+            fields = [i for i in ('status', 'priority', 'date_updated') if i in data]
+            if 'executor_id' in data:
+                fields.append('executor')
+            # Изменившиеся поля одинаковы у всех задач, поэтому представление строится без повторной выборки.
+            serializer = TaskSerializer(context=self.context)
+            events = {}
+            for task in self.instances:
+                task_data = serializer.to_representation(Task(id=task['id'], project_id=task['project_id'], **data))
+                events.setdefault(task['project_id'], []).append((task['id'], {i: task_data[i] for i in fields}))
+            for project_id, tasks in events.items():
+                send_task_events(project_id, 'updated', tasks)
+
+            executors = {}
+            for task in self.instances:
+                executors[task['executor_id']] = executors.get(task['executor_id'], 0) + 1
+            for executor_id, value in executors.items():
+                send_message(
+                    executor_id,
+                    f'Статус ваших задач изменён на {data["status"]}: {value}'
+                )
+            if 'executor_id' in data:
+                send_message(
+                    data['executor_id'],
+                    f'Вы были назначены ответственным за выполнение задач: {count}'
+                )
+        return count
+
+
+class SearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    project = serializers.IntegerField(required=False)
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=200, default=20)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    task_id = serializers.IntegerField()
+    project = serializers.SerializerMethodField(read_only=True)
+    text = serializers.CharField()
+    rank = serializers.FloatField()
+
+    def get_project(self, obj):
+        return reverse('projects', kwargs={'pk': obj['project_id']}, request=self.context.get('request'))
+
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -343,3 +532,63 @@ class CommentSerializer(serializers.ModelSerializer):
         task_instance = Task.objects.filter(pk=pk).first()
         send_message(task_instance.executor_id, 'К вашей задаче добавлен комментарий')
         return super().save(task=task_instance, task_id=pk)
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(min_value=0, default=0)
+    project = serializers.IntegerField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    """
+    Элемент ленты изменений. `data` — текущее состояние объекта из `context['objects']`; для удалённых объектов
+    (и объектов, которых уже нет в базе) — `None`, а `action` — `deleted`.
+    """
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField(source='object_id')
+    cursor = serializers.IntegerField(source='pk')
+    action = serializers.SerializerMethodField()
+    data = serializers.SerializerMethodField()
+
+    # Сериализаторы и выборки текущего состояния объектов по типу записи журнала.
+    object_serializers = {
+        'project': (ProjectSerializer, lambda: ProjectSerializer.setup_eager_loading(Project.objects.all())),
+        'task': (TaskSerializer, lambda: Task.objects.all()),
+        'hiring': (HiringSerializer, lambda: Hiring.objects.all()),
+        'comment': (CommentSerializer, lambda: Comment.objects.all()),
+    }
+
+    class Meta:
+        model = Change
+        fields = [
+            'cursor',
+            'type',
+            'id',
+            'project_id',
+            'action',
+            'date_created',
+            'data',
+        ]
+
+    @classmethod
+    def load_objects(cls, changes, context):
+        """Текущее состояние всех не удалённых объектов страницы — по одному запросу на тип."""
+        ids = {}
+        for change in changes:
+            if change.action != 'deleted':
+                ids.setdefault(change.kind, set()).add(change.object_id)
+        objects = {}
+        for kind, pks in ids.items():
+            serializer, queryset = cls.object_serializers[kind]
+            for instance in queryset().filter(pk__in=pks):
+                objects[kind, instance.pk] = serializer(instance, context=context).data
+        return objects
+
+    def get_action(self, obj):
+        if (obj.kind, obj.object_id) not in self.context['objects']:
+            return 'deleted'
+        return obj.action
+
+    def get_data(self, obj):
+        return self.context['objects'].get((obj.kind, obj.object_id))
@@ -0,0 +1,150 @@
+import datetime
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_project_version
+from .changes import record_change, record_changes
+from .fields import invalidate_user_choices
+from .models import Comment, CustomUser, Hiring, Project, ProjectStats, Task
+from .notifications import send_task_event
+
+
+@receiver(post_save, sender=Project)
+def create_project_stats(sender, instance, created, **kwargs):
+    if created:
+        ProjectStats.objects.get_or_create(project=instance)
+
+
+def get_task_project_ids(instance):
+    """Проект задачи и, если задачу перенесли в другой проект, прежний проект (`Task._saved_project_id`)."""
+    previous = getattr(instance, '_saved_project_id', None)
+    if previous is None or previous == instance.project_id:
+        return [instance.project_id]
+    return [previous, instance.project_id]
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def refresh_project_stats(sender, instance, **kwargs):
+    for project_id in get_task_project_ids(instance):
+        ProjectStats.refresh(project_id)
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    # Создание и изменение публикуют пути записи (`TaskSerializer`, массовые операции): им нужен запрос для ссылок
+    # и список изменившихся полей. Удаление публикуется здесь, чтобы учесть и каскадное удаление вместе с проектом.
+    send_task_event(instance.project_id, 'deleted', instance.id)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def bump_project_cache(sender, instance, **kwargs):
+    bump_project_version(instance.id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_task_project_cache(sender, instance, **kwargs):
+    for project_id in get_task_project_ids(instance):
+        bump_project_version(project_id)
+
+
+@receiver(post_save, sender=Hiring)
+@receiver(post_delete, sender=Hiring)
+def bump_related_project_cache(sender, instance, **kwargs):
+    bump_project_version(instance.project_id)
+
+
+@receiver(post_save, sender=Hiring)
+@receiver(post_delete, sender=Hiring)
+def touch_project_on_hiring(sender, instance, **kwargs):
+    # Роли участников входят в представление проекта, поэтому их изменение обновляет `date_updated` проекта
+    # (по нему строятся `ETag` и `Last-Modified`).
+    Project.objects.filter(pk=instance.project_id).update(date_updated=datetime.datetime.today())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, created=None, **kwargs):
+    # Комментарий не хранит проект: он ищется одним запросом и для кэша, и для журнала изменений.
+    project_id = Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True).first()
+    if project_id is not None:
+        bump_project_version(project_id)
+    if created is None:
+        action = 'deleted'
+    else:
+        action = 'created' if created else 'updated'
+    record_change('comment', instance.id, project_id, action)
+
+
+@receiver(m2m_changed, sender=Project.users.through)
+def bump_project_users_cache(sender, instance, action, pk_set=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Project):
+        bump_project_version(instance.id)
+        record_change('project', instance.id, instance.id, 'updated')
+    else:
+        project_ids = list(pk_set or Project.objects.filter(users=instance).values_list('id', flat=True))
+        for project_id in project_ids:
+            bump_project_version(project_id)
+        record_changes('project', [(i, i) for i in project_ids], 'updated')
+
+
+@receiver(m2m_changed, sender=Project.users.through)
+def record_project_users_hirings(sender, instance, action, pk_set=None, **kwargs):
+    # `Project.users.add/set` создают строки `Hiring` через `bulk_create`, без `post_save`, поэтому они записываются
+    # в журнал по строкам промежуточной таблицы. Удаление (`remove`, `clear`) вызывает `post_delete` у `Hiring`.
+    if action != 'post_add' or not pk_set:
+        return
+    if isinstance(instance, Project):
+        hirings = Hiring.objects.filter(project=instance, user_id__in=pk_set)
+    else:
+        hirings = Hiring.objects.filter(user=instance, project_id__in=pk_set)
+    record_changes('hiring', list(hirings.order_by('id').values_list('id', 'project_id')), 'created')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Hiring)
+def record_saved_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    project_id = instance.id if sender is Project else instance.project_id
+    record_change(sender._meta.model_name, instance.id, project_id, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Hiring)
+def record_deleted_change(sender, instance, **kwargs):
+    project_id = instance.id if sender is Project else instance.project_id
+    record_change(sender._meta.model_name, instance.id, project_id, 'deleted')
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_choices_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_user_choices()
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_choices_on_delete(sender, instance, **kwargs):
+    invalidate_user_choices()
+
+
+@receiver(post_save, sender=CustomUser)
+def touch_projects_on_profile(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Имя и почта участников входят в представление проекта (`user_roles`), поэтому изменение профиля обновляет
+    # `date_updated` проектов пользователя и сбрасывает их закэшированные ответы.
+    if created or raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    project_ids = list(Hiring.objects.filter(user=instance).order_by().values_list('project_id', flat=True).distinct())
+    if not project_ids:
+        return
+    Project.objects.filter(pk__in=project_ids).update(date_updated=datetime.datetime.today())
+    for project_id in project_ids:
+        bump_project_version(project_id)
@@ -0,0 +1,57 @@
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_QUERY_PARAM = 'stream'
+STREAM_CHUNK_SIZE = getattr(settings, 'STREAM_CHUNK_SIZE', 2000)
+
+
+def is_streaming(request):
+    return request.query_params.get(STREAM_QUERY_PARAM, '').lower() in ('1', 'true')
+
+
+def iter_json_array(queryset, serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Построчно сериализует выборку в JSON-массив.
+
+    Выборка читается через `iterator()` кусками по `chunk_size` строк (на PostgreSQL — серверным курсором), а каждая
+    строка сразу преобразуется `serializer.to_representation`, поэтому в памяти не держится весь список объектов.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    yield '['
+    separator = ''
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield separator + encoder.encode(serializer.to_representation(instance))
+        separator = ','
+    yield ']'
+
+
+async def aiter_json_array(queryset, serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """То же, что `iter_json_array`, но выборка читается асинхронно (`aiterator`) и не занимает поток."""
+    encoder = JSONEncoder(ensure_ascii=False)
+    yield '['
+    separator = ''
+    async for instance in queryset.aiterator(chunk_size=chunk_size):
+        yield separator + encoder.encode(serializer.to_representation(instance))
+        separator = ','
+    yield ']'
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def stream_json(queryset, serializer, request=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Потоковый JSON-ответ. Под ASGI Django собирает синхронный итератор целиком в список перед отправкой первого
+    байта, поэтому для запросов через ASGI тело отдаётся асинхронным итератором (`aiter_json_array`).
+    """
+    iterator = aiter_json_array if request is not None and is_asgi(request) else iter_json_array
+    return StreamingHttpResponse(
+        iterator(queryset, serializer, chunk_size),
+        content_type='application/json',
+        status=200,
+    )
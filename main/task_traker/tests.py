@@ -1,7 +1,37 @@
-from django.urls import reverse
+import asyncio
+import datetime
+import json
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from accounts.views import UserProfileView
+from channels.layers import get_channel_layer
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.http import http_date
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import BaseSerializer
 from rest_framework.test import APITestCase
-from .models import Project, Task, CustomUser
+from rest_framework_simplejwt.tokens import AccessToken
+from . import benchmarks
+from .checks import check_response_cache
+from .mail import queue_mail, send_queued_mail
+from .models import Project, Task, CustomUser, ProjectStats, OutgoingMail, Comment, Change, Hiring
+from .notifications import delivery, get_group_name, get_project_group_name, send_message
+from .profiling import get_query_budget
+from .seeding import seed
+from .serializers import FilterTasksSerializer
+from .views import ProjectView, TaskProjectView, TasksView
 
 
 class ProjectTests(APITestCase):
@@ -73,3 +103,757 @@ class TaskTests(APITestCase):
         response = self.client.get(url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+
+
+class ProjectListQueriesTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='TestEmail@gmail.com', password='testpassword', email='TestEmail@gmail.com')
+
+    def create_projects(self, count):
+        for n in range(count):
+            project = Project.objects.create(title=f'Project {n}', description='This is a test project.')
+            project.users.set([self.user.id])
+            for m in range(3):
+                Task.objects.create(
+                    title=f'Task {m}',
+                    description='This is a test task.',
+                    project=project,
+                    executor=self.user,
+                )
+
+    def test_queries_do_not_grow_with_projects(self):
+        url = reverse('all_projects')
+        self.create_projects(2)
+        # Проверка `ETag`, проекты со статистикой, задачи и участники.
+        with self.assertNumQueries(4):
+            self.client.get(url, format='json')
+        self.create_projects(5)
+        with self.assertNumQueries(4):
+            response = self.client.get(url, format='json')
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(response.data[0]['tasks']), 3)
+
+
+class ProjectStatsTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+
+    def test_stats_follow_task_changes(self):
+        task = Task.objects.create(title='Test Task', description='This is a test task.', project=self.project)
+        Task.objects.create(title='Other Task', description='This is a test task.', project=self.project, status='done')
+        task.status = 'done'
+        task.save()
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.value_tasks, 2)
+        self.assertEqual(self.project.stats.statuses, {'done': 2})
+        task.delete()
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.value_tasks, 1)
+
+    def test_stats_follow_moved_task(self):
+        other = Project.objects.create(title='Other Project', description='This is a test project.')
+        Task.objects.create(title='Test Task', description='This is a test task.', project=self.project, status='done')
+        task = Task.objects.get()
+        task.project = other
+        task.save()
+        self.project.stats.refresh_from_db()
+        other.stats.refresh_from_db()
+        self.assertEqual((self.project.stats.value_tasks, self.project.stats.statuses), (0, {}))
+        self.assertEqual((other.stats.value_tasks, other.stats.statuses), (1, {'done': 1}))
+        # После сохранения прежним считается уже новый проект.
+        task.project = self.project
+        task.save()
+        other.stats.refresh_from_db()
+        self.project.stats.refresh_from_db()
+        self.assertEqual((self.project.stats.value_tasks, other.stats.value_tasks), (1, 0))
+
+    def test_project_delete_with_tasks(self):
+        Task.objects.create(title='Test Task', description='This is a test task.', project=self.project)
+        self.project.delete()
+        self.assertFalse(ProjectStats.objects.exists())
+
+    def test_deadline_tasks_read_at_request_time(self):
+        today = datetime.datetime.today()
+        Task.objects.create(
+            title='Test Task',
+            description='This is a test task.',
+            project=self.project,
+            deadline=today + datetime.timedelta(days=5),
+        )
+        url = reverse('projects', kwargs={'pk': self.project.id})
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.data[0]['statistic']['deadline_tasks'], [])
+
+        # Окно дедлайна сдвигается со временем без изменения задачи и её статистики.
+        for days, expected in ((3, ['Test Task']), (6, [])):
+            window = (today + datetime.timedelta(days=days), today + datetime.timedelta(days=days + 3))
+            with mock.patch.object(ProjectStats, 'get_deadline_range', return_value=window):
+                self.assertEqual(ProjectStats.get_deadline_tasks(self.project.id), expected)
+                response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data[0]['statistic']['deadline_tasks'], expected)
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+        for n in range(5):
+            Task.objects.create(
+                title=f'Task {n}',
+                description='This is a test task.',
+                project=self.project,
+                date_updated='2024-11-26 00:00',
+            )
+
+    def test_walk_pages(self):
+        url = reverse('tasks')
+        response = self.client.get(url, {'page_size': 2}, format='json')
+        titles = [i['title'] for i in response.data]
+        self.assertNotIn('X-Previous-Cursor', response)
+        while 'X-Next-Cursor' in response:
+            response = self.client.get(url, {'page_size': 2, 'cursor': response['X-Next-Cursor']}, format='json')
+            titles += [i['title'] for i in response.data]
+        self.assertEqual(titles, [f'Task {n}' for n in reversed(range(5))])
+
+        response = self.client.get(url, {'page_size': 2, 'cursor': response['X-Previous-Cursor']}, format='json')
+        self.assertEqual([i['title'] for i in response.data], ['Task 2', 'Task 1'])
+
+    def test_walk_pages_with_equal_microseconds(self):
+        Task.objects.update(date_updated=datetime.datetime(2024, 11, 26, 12, 0, 0, 123456))
+        Task.objects.create(
+            title='Task 5',
+            description='This is a test task.',
+            project=self.project,
+            date_updated=datetime.datetime(2024, 11, 26, 12, 0, 0, 123456),
+        )
+        for sort_by, expected in (
+            (None, [f'Task {n}' for n in reversed(range(6))]),
+            ('date_updated', [f'Task {n}' for n in range(6)]),
+        ):
+            with self.subTest(sort_by):
+                titles, cursor = [], ''
+                while cursor is not None and len(titles) <= len(expected):
+                    url = f'{reverse("tasks")}?page_size=2&cursor={cursor}'
+                    if sort_by is None:
+                        response = self.client.get(url, format='json')
+                    else:
+                        response = self.client.post(url, {'sort_by': sort_by}, format='json')
+                    titles += [i['title'] for i in response.data]
+                    cursor = response.headers.get('X-Next-Cursor')
+                self.assertEqual(titles, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('tasks'), {'cursor': 'broken'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StreamingTests(APITestCase):
+    def test_stream_tasks(self):
+        project = Project.objects.create(title='Test Project', description='This is a test project.')
+        for n in range(3):
+            Task.objects.create(title=f'Task {n}', description='This is a test task.', project=project)
+        response = self.client.get(reverse('tasks'), {'stream': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(sorted(i['title'] for i in data), ['Task 0', 'Task 1', 'Task 2'])
+
+    def test_stream_projects_asgi(self):
+        project = Project.objects.create(title='Test Project', description='This is a test project.')
+        for n in range(3):
+            Task.objects.create(title=f'Task {n}', description='This is a test task.', project=project)
+
+        async def run():
+            response = await self.async_client.get(reverse('all_projects'), {'stream': 1})
+            return response, b''.join([i async for i in response.streaming_content])
+
+        response, content = async_to_sync(run)()
+        self.assertTrue(response.is_async)
+        data = json.loads(content)
+        self.assertEqual(len(data[0]['tasks']), 3)
+
+
+class QueryPlanTests(APITestCase):
+    def test_query_shapes_use_indexes(self):
+        call_command('explain_queries', '--strict', stdout=StringIO())
+
+
+class UserChoiceFieldTests(APITestCase):
+    def test_choices_follow_new_users(self):
+        user = CustomUser.objects.create(username='first@gmail.com', email='first@gmail.com')
+        self.assertIn(user.id, FilterTasksSerializer().fields['executor_id'].choices)
+        other = CustomUser.objects.create(username='second@gmail.com', email='second@gmail.com')
+        self.assertIn(other.id, FilterTasksSerializer().fields['executor_id'].choices)
+        other_id = other.id
+        other.delete()
+        self.assertNotIn(other_id, FilterTasksSerializer().fields['executor_id'].choices)
+
+    def test_validate_single_id(self):
+        user = CustomUser.objects.create(username='first@gmail.com', email='first@gmail.com')
+        field = FilterTasksSerializer().fields['executor_id']
+        with self.assertNumQueries(1):
+            self.assertEqual(field.run_validation(str(user.id)), user.id)
+        with self.assertRaises(ValidationError):
+            field.run_validation(str(user.id + 1))
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationTests(APITestCase):
+    def receive(self, channel_layer, channel):
+        delivery.wait()
+        return async_to_sync(channel_layer.receive)(channel)
+
+    def test_messages_sent_after_commit(self):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(get_group_name(1), channel)
+        with self.captureOnCommitCallbacks() as callbacks:
+            send_message(1, 'first')
+            send_message(1, 'second')
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(self.receive(channel_layer, channel)['message'], 'first')
+        self.assertEqual(self.receive(channel_layer, channel)['message'], 'second')
+
+    def test_messages_dropped_on_rollback(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    send_message(1, 'lost')
+                    raise ValueError
+            except ValueError:
+                pass
+            send_message(1, 'kept')
+        self.assertEqual(len(callbacks), 1)
+
+    def test_messages_of_savepoint_dropped_on_rollback(self):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(get_group_name(1), channel)
+        with self.captureOnCommitCallbacks(execute=True):
+            send_message(1, 'first')
+            try:
+                with transaction.atomic():
+                    send_message(1, 'lost')
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                send_message(1, 'inner')
+            send_message(1, 'last')
+        self.assertEqual([self.receive(channel_layer, channel)['message'] for _ in range(3)], ['first', 'inner', 'last'])
+        with self.assertRaises(asyncio.TimeoutError):
+            async_to_sync(asyncio.wait_for)(channel_layer.receive(channel), 0.1)
+
+    def test_task_events(self):
+        project = Project.objects.create(title='Test Project', description='This is a test project.')
+        task = Task.objects.create(title='Test Task', description='This is a test task.', project=project)
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(get_project_group_name(project.id), channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/v1/tasks/{task.id}/update', {'status': 'done', 'priority': 0}, format='json')
+        event = self.receive(channel_layer, channel)
+        self.assertEqual((event['action'], event['task']), ('updated', task.id))
+        self.assertEqual(set(event['data']), {'status', 'date_updated'})
+        self.assertEqual(event['data']['status'], 'done')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.receive(channel_layer, channel)['action'], 'deleted')
+
+    def test_bulk_task_events(self):
+        project = Project.objects.create(title='Test Project', description='This is a test project.')
+        ids = [
+            Task.objects.create(title=f'Task {n}', description='This is a test task.', project=project).id
+            for n in range(3)
+        ]
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(get_project_group_name(project.id), channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse('bulk_update_tasks'), {'tasks': ids, 'status': 'done'}, format='json')
+        event = self.receive(channel_layer, channel)
+        self.assertEqual((event['type'], event['action']), ('task.events', 'updated'))
+        self.assertEqual(sorted(i['task'] for i in event['tasks']), ids)
+        self.assertEqual(event['tasks'][0]['data']['status'], 'done')
+        with self.assertRaises(asyncio.TimeoutError):
+            async_to_sync(asyncio.wait_for)(channel_layer.receive(channel), 0.1)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationAutocommitTests(TransactionTestCase):
+    def receive(self, channel_layer, channel):
+        delivery.wait()
+        return async_to_sync(asyncio.wait_for)(channel_layer.receive(channel), 5)
+
+    def test_message_sent_through_on_commit(self):
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(get_group_name(1), channel)
+        with mock.patch.object(transaction, 'on_commit', wraps=transaction.on_commit) as on_commit:
+            send_message(1, 'now')
+        self.assertTrue(on_commit.call_args.kwargs['robust'])
+        self.assertEqual(self.receive(channel_layer, channel)['message'], 'now')
+
+    def test_delivery_does_not_block_commit(self):
+        release, sent = threading.Event(), []
+
+        def send(events):
+            release.wait(5)
+            sent.extend(events)
+
+        with mock.patch.object(delivery, 'send', side_effect=send):
+            send_message(1, 'later')
+            self.assertEqual(sent, [])
+            release.set()
+            delivery.wait()
+        self.assertEqual([event['message'] for _, event in sent], ['later'])
+
+
+class MailOutboxTests(APITestCase):
+    def test_send_queued_mail(self):
+        for n in range(3):
+            queue_mail('Subject', f'Body {n}', 'from@gmail.com', [f'user{n}@gmail.com'])
+        self.assertEqual(send_queued_mail(batch_size=2), 2)
+        self.assertEqual(send_queued_mail(batch_size=2), 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutgoingMail.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1', EMAIL_PORT=1)
+    def test_retry_with_backoff(self):
+        queue_mail('Subject', 'Body', 'from@gmail.com', ['user@gmail.com'])
+        self.assertEqual(send_queued_mail(max_attempts=2), 0)
+        outgoing = OutgoingMail.objects.get()
+        self.assertEqual(outgoing.attempts, 1)
+        self.assertEqual(outgoing.status, 'pending')
+        self.assertGreater(outgoing.next_attempt_at, datetime.datetime.today())
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        # Кэш ответов работает только с общим кэшем; файловый кэш общий для процессов одной машины.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(RESPONSE_CACHE_ENABLED=True, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name},
+        }))
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+        self.url = reverse('projects', kwargs={'pk': self.project.id})
+
+    def test_hit_and_invalidate(self):
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        # Единственный запрос — проверка `date_updated` для условного GET.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, format='json')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        Task.objects.create(title='Test Task', description='This is a test task.', project=self.project)
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['statistic']['value_tasks'], 1)
+
+    def test_profile_change_invalidates(self):
+        user = CustomUser.objects.create(username='TestEmail@gmail.com', email='TestEmail@gmail.com', first_name='Old')
+        self.project.users.add(user)
+        response = self.client.get(self.url, format='json')
+        self.assertEqual(self.client.get(self.url, format='json')['X-Cache'], 'HIT')
+
+        user.first_name = 'New'
+        user.save()
+        response = self.client.get(self.url, format='json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['user_roles'], ['New - TestEmail@gmail.com - programmer'])
+
+    def test_process_local_cache_not_used(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertNotIn('X-Cache', self.client.get(self.url, format='json'))
+            self.assertEqual([i.id for i in check_response_cache(None)], ['task_traker.W001'])
+        self.assertEqual(check_response_cache(None), [])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+        self.task = Task.objects.create(title='Test Task', description='This is a test task.', project=self.project)
+
+    def test_task_not_modified(self):
+        url = f'/api/v1/tasks/{self.task.id}/update'
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        not_modified = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.put(url, {'status': 'done'}, format='json')
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['status'], 'done')
+
+    def test_project_changes_with_tasks(self):
+        for url in (reverse('projects', kwargs={'pk': self.project.id}), reverse('all_projects')):
+            etag = self.client.get(url, format='json')['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+            Task.objects.create(title=f'Task {url}', description='This is a test task.', project=self.project)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_task_list_changes_on_delete(self):
+        url = reverse('tasks')
+        etag = self.client.get(url, format='json')['ETag']
+        self.task.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        url = reverse('tasks')
+        Task.objects.create(title='Other Task', description='This is a test task.', project=self.project)
+        response = self.client.get(url, format='json')
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('ETag', response)
+        # Последнее изменение оставшейся задачи раньше удаления, поэтому по времени список не изменился бы.
+        since = http_date(time.time() + 60)
+        self.task.delete()
+        response = self.client.get(url, format='json', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([i['title'] for i in response.data], ['Other Task'])
+
+class BulkTaskTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='TestEmail@gmail.com', password='testpassword', email='TestEmail@gmail.com')
+        self.project = Project.objects.create(
+            title='Test Project',
+            description='This is a test project.',
+        )
+        self.project.users.set([self.user.id],)
+        self.url = reverse('bulk_add_tasks')
+
+    def get_data(self, count):
+        return {
+            'project': 'http://127.0.0.1/api/v1/projects/' + str(self.project.id),
+            'tasks': [
+                {
+                    'title': f'Test Task {n}',
+                    'description': 'This is a test task.',
+                    'deadline': '2024-11-26 00:00',
+                    'executor': 'http://127.0.0.1/api/v1/profile/' + str(self.user.id),
+                    'tester': self.user.id,
+                    'status': 'in_progress',
+                    'priority': 0,
+                } for n in range(count)
+            ],
+        }
+
+    def test_bulk_create(self):
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, self.get_data(50), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 50)
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.value_tasks, 50)
+
+    def test_bulk_create_errors(self):
+        Task.objects.create(title='Test Task 1', description='This is a test task.', project=self.project)
+        data = self.get_data(3)
+        data['tasks'][2]['executor'] = 'http://127.0.0.1/api/v1/profile/' + str(self.user.id + 1)
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data[0]['errors']['tasks']
+        self.assertEqual(errors[0], {})
+        self.assertIn('title', errors[1])
+        self.assertIn('executor', errors[2])
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_bulk_transition(self):
+        self.client.post(self.url, self.get_data(30), format='json')
+        ids = list(Task.objects.values_list('id', flat=True))
+        with self.assertNumQueries(6):
+            response = self.client.put(
+                reverse('bulk_update_tasks'),
+                {'tasks': ids, 'status': 'done', 'priority': 2},
+                format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(status='done', priority='2').count(), 30)
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.statuses, {'done': 30})
+
+    def test_bulk_transition_missing_tasks(self):
+        response = self.client.put(reverse('bulk_update_tasks'), {'tasks': [1], 'status': 'done'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+        self.other = Project.objects.create(title='Other Project', description='This is a test project.')
+        self.task = Task.objects.create(title='Deploy server', description='Release build', project=self.project)
+        Task.objects.create(title='Fix login', description='Deploy hotfix', project=self.other)
+        Comment.objects.create(task=self.task, text='Server deploy blocked by "migrations"')
+
+    def test_search(self):
+        response = self.client.get(reverse('search'), {'q': 'deploy'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]['type'], 'task')
+        self.assertEqual(response.data[0]['id'], self.task.id)
+
+    def test_search_project_and_update(self):
+        self.task.title = 'Deploy database'
+        self.task.save()
+        response = self.client.get(reverse('search'), {'q': 'datab "', 'project': self.project.id}, format='json')
+        self.assertEqual([i['id'] for i in response.data], [self.task.id])
+        self.task.delete()
+        response = self.client.get(reverse('search'), {'q': 'deploy', 'project': self.project.id}, format='json')
+        self.assertEqual(response.data, [])
+
+    def test_search_other_database(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse('search'), {'q': 'DEPLOY'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([(i['type'], i['rank']) for i in response.data], [
+                ('task', 2.0), ('task', 1.0), ('comment', 1.0),
+            ])
+            self.assertEqual(response.data[0]['id'], self.task.id)
+            response = self.client.get(reverse('search'), {'q': 'deploy', 'project': self.project.id}, format='json')
+            self.assertEqual([i['type'] for i in response.data], ['task', 'comment'])
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'task_traker.profiling.ProfilingMiddleware'})
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        project = Project.objects.create(title='Test Project', description='This is a test project.')
+        Task.objects.create(title='Test Task', description='This is a test task.', project=project)
+
+    def test_server_timing(self):
+        data = BaseSerializer.__dict__['data']
+        with self.assertLogs('task_traker.profiling', 'INFO') as logs:
+            response = self.client.get(reverse('tasks'), format='json')
+        timing = dict(i.split(';', 1) for i in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['path'], reverse('tasks'))
+        self.assertIn(f'desc="{line["queries"]} queries"', timing['db'])
+        self.assertGreater(line['queries'], 0)
+        self.assertEqual(line['flags'], [])
+        # Замер сериализации снимается вместе с запросом и не остаётся на `BaseSerializer`.
+        self.assertIs(BaseSerializer.__dict__['data'], data)
+
+    @override_settings(PROFILING_QUERY_THRESHOLD=0)
+    def test_flags_query_threshold(self):
+        with self.assertLogs('task_traker.profiling', 'WARNING') as logs:
+            self.client.get(reverse('tasks'), format='json')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['flags'], ['queries'])
+
+    def test_flags_query_budget(self):
+        with mock.patch.object(TasksView, 'query_budget', {'GET': 0}):
+            with self.assertLogs('task_traker.profiling', 'WARNING') as logs:
+                self.client.get(reverse('tasks'), format='json')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['budget'], line['flags']), (0, ['budget']))
+
+
+@override_settings(
+    CHANGE_FEED_SETTLE_SECONDS=0,
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+)
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('changes')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+            self.task = Task.objects.create(title='Test Task', description='This is a test task.', project=self.project)
+        self.cursor = Change.objects.order_by('-id').first().id
+
+    def test_changes_since_cursor(self):
+        response = self.client.get(self.url, format='json')
+        self.assertEqual([(i['type'], i['action']) for i in response.data], [('project', 'created'), ('task', 'created')])
+        self.assertEqual(response.data[1]['data']['title'], 'Test Task')
+        self.assertEqual(response['X-Next-Cursor'], str(self.cursor))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'done'
+            self.task.save()
+            comment = Comment.objects.create(task=self.task, text='Test comment')
+            task_id = self.task.id
+            self.task.delete()
+        response = self.client.get(self.url, {'cursor': self.cursor}, format='json')
+        self.assertEqual(
+            [(i['type'], i['id'], i['action'], i['data']) for i in response.data],
+            [('comment', comment.id, 'deleted', None), ('task', task_id, 'deleted', None)],
+        )
+
+        response = self.client.get(self.url, {'cursor': response['X-Next-Cursor']}, format='json')
+        self.assertEqual(response.data, [])
+
+    def test_project_users_record_hirings(self):
+        user = CustomUser.objects.create(username='TestEmail@gmail.com', email='TestEmail@gmail.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                f'/api/v1/projects/{self.project.id}/update', {'users': [user.email]}, format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hiring = Hiring.objects.get(project=self.project, user=user)
+        changes = Change.objects.filter(id__gt=self.cursor, kind='hiring')
+        self.assertEqual(list(changes.values_list('object_id', 'action')), [(hiring.id, 'created')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.users.remove(user)
+        self.assertEqual(list(changes.values_list('object_id', 'action')), [
+            (hiring.id, 'created'), (hiring.id, 'deleted'),
+        ])
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        try:
+            with transaction.atomic():
+                Task.objects.create(title='Other Task', description='This is a test task.', project=self.project)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(Change.objects.filter(id__gt=self.cursor).count(), 0)
+
+    def test_changes_of_savepoint_dropped_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title='Kept Task', description='This is a test task.', project=self.project)
+            try:
+                with transaction.atomic():
+                    Task.objects.create(title='Lost Task', description='This is a test task.', project=self.project)
+                    raise ValueError
+            except ValueError:
+                pass
+        kept = Task.objects.get(title='Kept Task')
+        self.assertEqual(
+            list(Change.objects.filter(id__gt=self.cursor).values_list('kind', 'object_id')),
+            [('task', kept.id)],
+        )
+
+    def test_expired_cursor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(2):
+                Task.objects.create(title=f'Task {n}', description='This is a test task.', project=self.project)
+        Change.objects.filter(id__lte=self.cursor + 1).delete()
+        response = self.client.get(self.url, {'cursor': self.cursor}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        response = self.client.get(self.url, {'cursor': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_change_time_is_insert_time(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Task.objects.create(title='Other Task', description='This is a test task.', project=self.project)
+        committed = datetime.datetime.today()
+        for callback in callbacks:
+            callback()
+        self.assertGreaterEqual(Change.objects.order_by('-id').first().date_created, committed)
+
+
+class BenchmarkTests(APITestCase):
+    def test_seed(self):
+        created = seed(projects=2, users=4, members=3, tasks=5, comments=1)
+        self.assertEqual(created['hirings'], 6)
+        self.assertEqual(Task.objects.count(), 10)
+        self.assertEqual(ProjectStats.objects.count(), 2)
+
+    def test_run(self):
+        results = benchmarks.run(iterations=2, cases=['projects', 'tasks/add', 'tasks/<pk>/delete'])
+        endpoints = results['small']['endpoints']
+        self.assertEqual(set(endpoints), {'projects', 'tasks/add', 'tasks/<pk>/delete'})
+        self.assertEqual(endpoints['tasks/add']['statuses'], [201])
+        self.assertEqual(endpoints['tasks/<pk>/delete']['statuses'], [204])
+        self.assertGreater(endpoints['projects']['queries'], 0)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class QueryBudgetTests(APITestCase):
+    # Второй набор данных больше первого по всем измерениям: число запросов не должно от этого зависеть.
+    sizes = (
+        {'projects': 2, 'users': 6, 'members': 2, 'tasks': 2, 'comments': 1},
+        {'projects': 5, 'users': 15, 'members': 8, 'tasks': 12, 'comments': 3},
+    )
+
+    def count_queries(self, size):
+        call_command('flush', interactive=False, verbosity=0)
+        seed(**size)
+        self.client.force_authenticate(CustomUser.objects.create(username='budget', is_staff=True))
+        counts = {}
+        for name, method, prepare in benchmarks.get_cases(benchmarks.Fixtures()):
+            path, data = prepare()
+            budget = get_query_budget(resolve(urlsplit(path).path).func.view_class, method)
+            if budget is None:
+                continue
+            with CaptureQueriesContext(connection) as captured:
+                response = getattr(self.client, method)(path, data, format='json')
+            self.assertLess(response.status_code, 400, name)
+            counts[name] = (len(captured), budget)
+        return counts
+
+    def test_query_budgets(self):
+        small, large = (self.count_queries(i) for i in self.sizes)
+        self.assertIn('projects', large)
+        for name, (queries, budget) in large.items():
+            with self.subTest(name):
+                self.assertLessEqual(queries, budget)
+                self.assertEqual(queries, small[name][0])
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='TestEmail@gmail.com', email='TestEmail@gmail.com')
+        self.project = Project.objects.create(title='Test Project', description='This is a test project.')
+        self.project.users.add(self.user)
+        self.tasks = [
+            Task.objects.create(title=f'Task {n}', description='This is a test task.', project=self.project)
+            for n in range(3)
+        ]
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def test_views_are_async(self):
+        for view in (TasksView, TaskProjectView, ProjectView, UserProfileView):
+            with self.subTest(view.__name__):
+                self.assertTrue(iscoroutinefunction(view.as_view()))
+
+    async def test_read_endpoints(self):
+        responses = await asyncio.gather(
+            self.async_client.get(reverse('tasks'), {'page_size': 2}),
+            self.async_client.get(f'/api/v1/projects/{self.project.id}/tasks'),
+            self.async_client.get(reverse('all_projects')),
+            self.async_client.get('/api/v1/profile/&', headers=self.headers),
+        )
+        self.assertEqual([i.status_code for i in responses], [200] * 4)
+        tasks, project_tasks, projects, users = [i.json() for i in responses]
+        self.assertEqual(len(tasks), 2)
+        self.assertIn('X-Next-Cursor', responses[0])
+        self.assertEqual(sorted(i['title'] for i in project_tasks), ['Task 0', 'Task 1', 'Task 2'])
+        self.assertEqual(len(projects[0]['tasks']), 3)
+        self.assertEqual(users[0]['projects'], {'Test Project': 'programmer'})
+
+    async def test_conditional_get(self):
+        response = await self.async_client.get(reverse('tasks'))
+        response = await self.async_client.get(reverse('tasks'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @modify_settings(MIDDLEWARE={'prepend': 'task_traker.profiling.ProfilingMiddleware'})
+    async def test_profiling_counts_async_queries(self):
+        response = await self.async_client.get(f'/api/v1/tasks/{self.tasks[0].id}')
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+
+class DatabasePoolTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('db_pool')
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(CustomUser.objects.create(username='user'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pool_stats(self):
+        self.client.force_authenticate(CustomUser.objects.create(username='admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).json(), {'default': None})
+        pool = mock.Mock(**{'get_stats.return_value': {'pool_size': 2, 'pool_available': 1}})
+        with mock.patch.object(connections['default'], 'pool', pool, create=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), {'default': {'pool_size': 2, 'pool_available': 1}})
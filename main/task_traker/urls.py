@@ -14,10 +14,17 @@ urlpatterns = [
 
     path('tasks/', views.TasksView.as_view(), name='tasks'),
     path('tasks/add', views.AddTaskView.as_view(), name='add_tasks'),
+    path('tasks/bulk', views.BulkAddTaskView.as_view(), name='bulk_add_tasks'),
+    path('tasks/bulk/update', views.BulkUpdateTaskView.as_view(), name='bulk_update_tasks'),
     path('tasks/<int:pk>', views.TasksView.as_view()),
     path('tasks/<int:pk>/delete', views.DeleteTaskView.as_view()),
     path('tasks/<int:pk>/update', views.UpdateTaskView.as_view()),
     path('tasks/<int:task_id>/comments', views.CommentsView.as_view(), name='comments'),
     path('tasks/<int:task_id>/comments/<int:pk>/delete', views.DeleteCommentsView.as_view()),
-    path('tasks/<int:task_id>/comments/<int:pk>/update', views.UpdateCommentsView.as_view())
+    path('tasks/<int:task_id>/comments/<int:pk>/update', views.UpdateCommentsView.as_view()),
+
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('changes/', views.ChangesView.as_view(), name='changes'),
+
+    path('db/pool', views.DatabasePoolView.as_view(), name='db_pool'),
 ]
@@ -7,10 +7,20 @@ from rest_framework.generics import (
     ListAPIView,
     UpdateAPIView
 )
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
+from .asynchronous import AsyncAPIViewMixin
 from .models import Comment
 from .models import Project, Task, Hiring
+from .cache import cache_response
+from .changes import get_changes, is_expired
+from .conditional import conditional_response, project_state, project_tasks_state, task_state
+from .database import get_pool_stats
+from .search import search
+from .streaming import is_streaming, stream_json
 from .serializers import (
     SortProjectsSerializer,
     FilterProjectsTasksSerializer,
@@ -18,7 +28,13 @@ from .serializers import (
     FilterTasksSerializer,
     ProjectSerializer,
     TaskSerializer,
-    HiringSerializer
+    HiringSerializer,
+    BulkTaskSerializer,
+    BulkTaskTransitionSerializer,
+    SearchSerializer,
+    SearchResultSerializer,
+    ChangeFeedSerializer,
+    ChangeSerializer
 )
 
 
@@ -85,6 +101,7 @@ class UpdateProjectView(UpdateAPIView):
 
     - queryset: `Project.objects.all()` — набор всех объектов `Project`.
     - serializer_class: `ProjectSerializer` — сериализатор для представления данных о проекте.
+    - query_budget: `{'GET': 4, 'PUT': 5}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -94,6 +111,8 @@ class UpdateProjectView(UpdateAPIView):
 
     - Возвращает данные проекта с указанным первичным ключом (`pk`).
     - Возвращает статус 200 OK.
+    - Отдаёт заголовки `ETag` и `Last-Modified`; на совпадающий `If-None-Match` или `If-Modified-Since` отвечает
+    `304 Not Modified` без сериализации (`conditional_response`).
 
     `put(request, *args, **kwargs)`
 
@@ -105,13 +124,18 @@ class UpdateProjectView(UpdateAPIView):
     """
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
+    query_budget = {'GET': 4, 'PUT': 5}
 
+    @conditional_response(project_state)
+    @cache_response('project_update', per_project=True)
     def get(self, request, pk):
         return Response(
             data=[
                 self.get_serializer(
-                    self.queryset.filter(
-                        pk=pk,
+                    ProjectSerializer.setup_eager_loading(
+                        self.queryset.filter(
+                            pk=pk,
+                        ),
                     ).first(),
                     context={
                         'request': request,
@@ -128,7 +152,7 @@ class UpdateProjectView(UpdateAPIView):
         )
         if serializer.is_valid():
             instance = Project.objects.filter(pk=kwargs['pk']).first()
-            instance.date_updated = datetime.today().strftime('%Y-%m-%d %H:%M')
+            instance.date_updated = datetime.today()
             serializer.update(
                 instance,
                 serializer.validated_data,
@@ -152,22 +176,23 @@ class DeleteProjectView(DestroyAPIView):
     serializer_class = ProjectSerializer
 
 
-class TaskProjectView(ListAPIView):
+class TaskProjectView(AsyncAPIViewMixin, ListAPIView):
     """
     `TaskProjectView` — представление на основе `ListAPIView`, предоставляющее API для получения и фильтрации задач,
     связанных с конкретным проектом. Оно позволяет получать задачи по идентификатору проекта и фильтровать их по
-    сроку выполнения.
+    сроку выполнения. Обработчики асинхронные (`AsyncAPIViewMixin`): задачи читаются асинхронным ORM.
 
     Атрибуты класса
 
     - queryset: `Task.objects.all()` — набор всех объектов `Task`.
     - serializer_class: `FilterProje    ctsTasksSerializer` — сериализатор для фильтрации задач проекта.
+    - query_budget: `{'GET': 3, 'POST': 2}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
     `get_data(request, pk)`
 
-    Возвращает список задач, связанных с проектом, идентифицированным по первичному ключу `pk`.
+    Возвращает страницу задач, связанных с проектом, идентифицированным по первичному ключу `pk`.
 
     `get(request, *args, **kwargs)`
 
@@ -175,6 +200,8 @@ class TaskProjectView(ListAPIView):
 
     - Фильтрует задачи по идентификатору проекта, указанному в `kwargs['pk']`.
     - Возвращает список задач, сериализованных с помощью `TaskSerializer`.
+    - Отдаёт заголовок `ETag`; на совпадающий `If-None-Match` отвечает `304 Not Modified` без сериализации
+    (`conditional_response`). `Last-Modified` для списка не отдаётся: удаление задачи его не меняет.
 
     `post(request, pk)`
 
@@ -186,35 +213,48 @@ class TaskProjectView(ListAPIView):
     """
     queryset = Task.objects.all()
     serializer_class = FilterProjectsTasksSerializer
+    query_budget = {'GET': 3, 'POST': 2}
 
-    def get_data(self, request, pk):
-        instance = Project.objects.filter(pk=pk).first()
-        data = [TaskSerializer(i, context={'request': request}).data for i in
-                self.queryset.filter(project_id=instance.id)]
-        return data
+    ordering = ('-date_updated',)
 
-    def get(self, request, *args, **kwargs):
+    async def get_data(self, request, pk):
+        instance = await Project.objects.filter(pk=pk).afirst()
+        if is_streaming(request):
+            return stream_json(
+                self.queryset.filter(project_id=instance.id),
+                TaskSerializer(context={'request': request}),
+                request,
+            )
+        page = await self.apaginate_queryset(self.queryset.filter(project_id=instance.id))
+        return self.get_paginated_response(TaskSerializer(page, many=True, context={'request': request}).data)
+
+    @conditional_response(project_tasks_state)
+    @cache_response('project_tasks', per_project=True)
+    async def get(self, request, *args, **kwargs):
         self.queryset = Task.objects.filter(project_id=kwargs['pk'])
-        return Response(data=self.get_data(request, kwargs['pk']), status=200)
+        return await self.get_data(request, kwargs['pk'])
 
-    def post(self, request, pk):
+    @cache_response('project_tasks', per_project=True)
+    async def post(self, request, pk):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
             return Response(data=[{'errors': serializer.errors}], status=400)
         self.queryset = self.queryset.filter(deadline__range=(datetime.today(), serializer.validated_data['deadline']))
-        return Response(data=self.get_data(request, pk), status=200)
+        return await self.get_data(request, pk)
 
 
-class TasksView(ListAPIView):
+class TasksView(AsyncAPIViewMixin, ListAPIView):
     """
 
     `TasksView` — представление на основе `ListAPIView`, предоставляющее API для получения и фильтрации задач.
-    Оно позволяет получать список всех задач или фильтровать их по заданным критериям.
+    Оно позволяет получать список всех задач или фильтровать их по заданным критериям. Обработчики асинхронные
+    (`AsyncAPIViewMixin`): задачи читаются асинхронным ORM, и поток не занят на время запроса к базе.
 
     Атрибуты класса
 
     - queryset: `Task.objects.all()` — набор всех объектов `Task`.
     - serializer_class: `FilterTasksSerializer` — сериализатор для фильтрации задач.
+    - query_budget: `{'GET': 2, 'POST': 1}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -223,7 +263,12 @@ class TasksView(ListAPIView):
     Обрабатывает GET-запросы:
 
     - Возвращает данные задачи с указанным первичным ключом (`pk`), если он передан.
-    - Если `pk` не указан, возвращает список всех задач.
+    - Если `pk` не указан, возвращает список всех задач постранично (`KeysetPagination`, параметры `cursor` и
+    `page_size`, курсоры соседних страниц — в заголовках `Link`, `X-Next-Cursor` и `X-Previous-Cursor`).
+    - С параметром `?stream=1` возвращает все задачи одним потоковым JSON-массивом без пагинации: выборка читается
+    кусками, а задачи сериализуются по одной.
+    - Отдаёт заголовок `ETag`; на совпадающий `If-None-Match` отвечает `304 Not Modified` без сериализации
+    (`conditional_response`). `Last-Modified` для списка не отдаётся: удаление задачи его не меняет.
 
     `post(request, pk=None)`
 
@@ -241,34 +286,40 @@ class TasksView(ListAPIView):
     - Если `pk` не указан, возвращает список всех задач.
     """
     serializer_class = FilterTasksSerializer
+    query_budget = {'GET': 2, 'POST': 1}
     queryset = Task.objects.all()
+    ordering = ('-date_updated',)
 
-    def get(self, request, pk=None, **kwargs):
+    @conditional_response(task_state)
+    @cache_response('tasks')
+    async def get(self, request, pk=None, **kwargs):
         self.queryset = Task.objects.all()
-        return self.get_data(request, pk)
+        return await self.get_data(request, pk)
 
-    def post(self, request, pk=None):
+    @cache_response('tasks')
+    async def post(self, request, pk=None):
         data = {i: request.data[i] for i in request.data if
                 request.data[i] != 'None' and i not in ['csrfmiddlewaretoken', 'sort_by', 'deadline']}
         self.queryset = self.queryset.filter(**data)
         self.queryset = self.queryset.order_by(request.data['sort_by'])
-        return self.get_data(request, pk)
+        return await self.get_data(request, pk)
 
-    def get_data(self, request, pk=None):
+    async def get_data(self, request, pk=None):
         if pk is not None:
-            serializer = TaskSerializer(self.queryset.filter(pk=pk).first(), context={'request': request})
+            serializer = TaskSerializer(await self.queryset.filter(pk=pk).afirst(), context={'request': request})
             return Response(data=[serializer.data], status=200)
+        elif is_streaming(request):
+            return stream_json(self.get_queryset(), TaskSerializer(context={'request': request}), request)
         else:
-            return Response(
-                data=[
-                    TaskSerializer(
-                        i,
-                        context={
-                            'request': request,
-                        },
-                    ).data for i in self.get_queryset()
-                ],
-                status=200,
+            page = await self.apaginate_queryset(self.get_queryset())
+            return self.get_paginated_response(
+                TaskSerializer(
+                    page,
+                    many=True,
+                    context={
+                        'request': request,
+                    },
+                ).data,
             )
 
 
@@ -304,6 +355,42 @@ class AddTaskView(CreateAPIView):
         return Response(data=[{'message': 'Задача создана успешно'}], status=201)
 
 
+class BulkAddTaskView(CreateAPIView):
+    """
+
+    `BulkAddTaskView` — представление на основе `CreateAPIView`, предоставляющее API для создания множества задач
+    одного проекта за один запрос.
+
+    Атрибуты класса
+
+    - queryset: `Task.objects.all()` — набор всех объектов `Task`.
+    - serializer_class: `BulkTaskSerializer` — сериализатор со ссылкой на проект (`project`) и списком задач (`tasks`).
+    - query_budget: `{'POST': 12}` — бюджет SQL-запросов по методам HTTP.
+
+    Методы класса
+
+    `post(request, *args, **kwargs)`
+
+    Обрабатывает POST-запросы:
+
+    - Проверяет уникальность названий и участие исполнителей и тестировщиков в проекте одним запросом на весь список.
+    - Создает все задачи одной вставкой (`bulk_create`) в одной транзакции и отправляет каждому исполнителю одно
+    общее уведомление.
+    - Если данные невалидны, возвращает ошибки по каждой задаче со статусом 400 Bad Request.
+    - Если задачи успешно созданы, возвращает сообщение с числом созданных задач со статусом 201 Created.
+    """
+    queryset = Task.objects.all()
+    serializer_class = BulkTaskSerializer
+    query_budget = {'POST': 12}
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(data=[{'errors': serializer.errors}], status=400)
+        tasks = serializer.save()
+        return Response(data=[{'message': f'Создано задач: {len(tasks)}'}], status=201)
+
+
 class UpdateTaskView(UpdateAPIView):
     """
 
@@ -314,6 +401,7 @@ class UpdateTaskView(UpdateAPIView):
 
     - queryset: `Task.objects.all()` — набор всех объектов `Task`.
     - serializer_class: `TaskSerializer` — сериализатор для представления данных о задаче.
+    - query_budget: `{'GET': 2}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -323,6 +411,8 @@ class UpdateTaskView(UpdateAPIView):
 
     - Возвращает данные задачи с указанным первичным ключом (`pk`).
     - Возвращает статус 200 OK.
+    - Отдаёт заголовки `ETag` и `Last-Modified`; на совпадающий `If-None-Match` или `If-Modified-Since` отвечает
+    `304 Not Modified` без сериализации (`conditional_response`).
 
     `put(request, *args, **kwargs)`
 
@@ -334,7 +424,9 @@ class UpdateTaskView(UpdateAPIView):
     """
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    query_budget = {'GET': 2}
 
+    @conditional_response(task_state)
     def get(self, request, pk):
         return Response(
             data=[
@@ -354,7 +446,6 @@ class UpdateTaskView(UpdateAPIView):
             data={
                 'project': TaskSerializer(instance, context={'request': request}).data['project'],
                 **{i: request.data[i] for i in request.data},
-                'date_updated': datetime.today().date(),
             },
             context={
                 'request': request,
@@ -369,6 +460,43 @@ class UpdateTaskView(UpdateAPIView):
         return Response(data=[{'message': 'Задача обновлена успешно'}], status=200)
 
 
+class BulkUpdateTaskView(UpdateAPIView):
+    """
+
+    `BulkUpdateTaskView` — представление на основе `UpdateAPIView`, предоставляющее API для смены статуса (и, при
+    необходимости, исполнителя и приоритета) сразу у множества задач.
+
+    Атрибуты класса
+
+    - queryset: `Task.objects.all()` — набор всех объектов `Task`.
+    - serializer_class: `BulkTaskTransitionSerializer` — сериализатор со списком идентификаторов задач (`tasks`),
+    новым статусом (`status`) и необязательными `executor` и `priority`.
+    - query_budget: `{'PUT': 10}` — бюджет SQL-запросов по методам HTTP.
+
+    Методы класса
+
+    `put(request, *args, **kwargs)`
+
+    Обрабатывает PUT-запросы:
+
+    - Проверяет, что все задачи существуют, а новый исполнитель включён во все их проекты.
+    - Обновляет задачи одним запросом `UPDATE`, обновляет `date_updated` и отправляет каждому затронутому
+    исполнителю одно общее уведомление.
+    - Если данные невалидны, возвращает ошибки валидации со статусом 400 Bad Request.
+    - Если задачи обновлены, возвращает сообщение с числом обновлённых задач со статусом 200 OK.
+    """
+    queryset = Task.objects.all()
+    serializer_class = BulkTaskTransitionSerializer
+    query_budget = {'PUT': 10}
+
+    def put(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(data=[{'errors': serializer.errors}], status=400)
+        count = serializer.save()
+        return Response(data=[{'message': f'Обновлено задач: {count}'}], status=200)
+
+
 class DeleteTaskView(DestroyAPIView):
     """
 
@@ -396,6 +524,7 @@ class RolesProjectView(UpdateAPIView):
 
     - queryset: `Hiring.objects.all()` — набор всех объектов `Hiring`.
     - serializer_class: `HiringSerializer` — сериализатор для представления данных о найме.
+    - query_budget: `{'GET': 3}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -403,7 +532,8 @@ class RolesProjectView(UpdateAPIView):
 
     Обрабатывает GET-запросы:
 
-    - Возвращает список пользователей и их ролей, связанных с проектом, идентификатор которого передан в `pk`.
+    - Возвращает список пользователей и их ролей, связанных с проектом, идентификатор которого передан в `pk`,
+    постранично.
 
     `put(request, *args, **kwargs)`
 
@@ -416,19 +546,18 @@ class RolesProjectView(UpdateAPIView):
 
     queryset = Hiring.objects.all()
     serializer_class = HiringSerializer
+    query_budget = {'GET': 3}
 
     def get(self, request, pk):
-        instances = self.queryset.filter(project_id=pk)
-        return Response(
-            data=[
-                self.get_serializer(
-                    i,
-                    context={
-                        'request': request,
-                    },
-                ).data for i in instances
-            ],
-            status=200,
+        instances = self.paginate_queryset(self.queryset.filter(project_id=pk))
+        return self.get_paginated_response(
+            self.get_serializer(
+                instances,
+                many=True,
+                context={
+                    'request': request,
+                },
+            ).data,
         )
 
     def put(self, request, *args, **kwargs):
@@ -455,6 +584,7 @@ class CommentsView(ListCreateAPIView):
 
     - queryset: `Comment.objects.all()` — набор всех объектов `Comment`.
     - serializer_class: `CommentSerializer` — сериализатор для представления комментариев.
+    - query_budget: `{'GET': 1}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -462,7 +592,7 @@ class CommentsView(ListCreateAPIView):
 
     Обрабатывает GET-запросы:
 
-    - Возвращает список текстов комментариев, связанных с задачей.
+    - Возвращает список текстов комментариев, связанных с задачей, постранично.
 
     `post(request, *args, **kwargs)`
 
@@ -474,9 +604,11 @@ class CommentsView(ListCreateAPIView):
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    query_budget = {'GET': 1}
 
     def get(self, request, *args, **kwargs):
-        return Response([i.text for i in self.queryset.filter(task_id=kwargs['task_id'])], status=200)
+        page = self.paginate_queryset(self.queryset.filter(task_id=kwargs['task_id']))
+        return self.get_paginated_response([i.text for i in page])
 
     def post(self, request, *args, **kwargs):
         data = {'text': request.data['text'], 'task': kwargs['task_id']}
@@ -517,16 +649,18 @@ class UpdateCommentsView(UpdateAPIView):
     serializer_class = CommentSerializer
 
 
-class ProjectView(ListAPIView):
+class ProjectView(AsyncAPIViewMixin, ListAPIView):
     """
     `ProjectView` — представление на основе `ListAPIView`, предоставляющее API для получения и сортировки проектов. Оно
     фильтрует проекты, исключая приватные (`private=False`). Сортировка проектов реализуется с помощью
-    `SortProjectsSerializer`, а при преобразовании проектов в JSON используется `ProjectSerializer`.
+    `SortProjectsSerializer`, а при преобразовании проектов в JSON используется `ProjectSerializer`. Обработчики
+    асинхронные (`AsyncAPIViewMixin`).
 
     Атрибуты класса
 
     - queryset: `Project.objects.all()` — набор всех объектов `Project`.
     - serializer_class: `SortProjectsSerializer` — сериализатор для сортировки проектов.
+    - query_budget: `{'GET': 4, 'POST': 3}` — бюджет SQL-запросов по методам HTTP.
 
     Методы класса
 
@@ -540,6 +674,11 @@ class ProjectView(ListAPIView):
 
     - Если `pk` указан, возвращает данные проекта с этим первичным ключом, используя `ProjectSerializer`.
     - Если `pk` не указан, возвращает список всех публичных проектов, сериализованных с помощью `ProjectSerializer`.
+    - С параметром `?stream=1` список отдаётся потоковым JSON-массивом без пагинации.
+    - Задачи и участники всех проектов подгружаются заранее (`ProjectSerializer.setup_eager_loading`), поэтому число
+    запросов к базе не зависит от количества проектов и задач.
+    - Отдаёт заголовки `ETag` и `Last-Modified` (для списка — только `ETag`); на совпадающий `If-None-Match` или
+    `If-Modified-Since` отвечает `304 Not Modified` без сериализации (`conditional_response`).
 
     `post(request)`
 
@@ -550,36 +689,179 @@ class ProjectView(ListAPIView):
     """
     queryset = Project.objects.all()
     serializer_class = SortProjectsSerializer
+    query_budget = {'GET': 4, 'POST': 3}
+    ordering = ('-date_updated',)
 
     def get_queryset(self):
         queryset = self.queryset.filter(private=False)
         return queryset
 
-    def get(self, request, pk=None, **kwargs):
+    @conditional_response(project_state)
+    @cache_response('projects', per_project=True)
+    async def get(self, request, pk=None, **kwargs):
 
         if pk is not None:
             serializer = ProjectSerializer(
-                self.queryset.filter(
-                    pk=pk,
-                ).first(),
+                await ProjectSerializer.setup_eager_loading(
+                    self.queryset.filter(
+                        pk=pk,
+                    ),
+                ).afirst(),
                 context={
                     'request': request,
                 },
             )
             return Response(data=[serializer.data], status=200)
+        elif is_streaming(request):
+            return stream_json(
+                ProjectSerializer.setup_eager_loading(self.get_queryset()),
+                ProjectSerializer(context={'request': request}),
+                request,
+            )
         else:
-            return Response(
-                data=[
-                    ProjectSerializer(
-                        i,
-                        context={
-                            'request': request,
-                        },
-                    ).data for i in self.get_queryset()
-                ],
-                status=200,
+            page = await self.apaginate_queryset(ProjectSerializer.setup_eager_loading(self.get_queryset()))
+            return self.get_paginated_response(
+                ProjectSerializer(
+                    page,
+                    many=True,
+                    context={
+                        'request': request,
+                    },
+                ).data,
             )
 
-    def post(self, request):
+    async def post(self, request):
         self.queryset = self.queryset.order_by(request.data['order_by'])
-        return self.get(request)
+        return await self.get(request)
+
+
+class SearchView(ListAPIView):
+    """
+    `SearchView` — представление на основе `ListAPIView`, предоставляющее API для полнотекстового поиска по задачам
+    (название и описание) и комментариям.
+
+    Атрибуты класса
+
+    - serializer_class: `SearchSerializer` — сериализатор параметров поиска.
+    - query_budget: `{'GET': 1}` — бюджет SQL-запросов по методам HTTP.
+
+    Методы класса
+
+    `get(request, *args, **kwargs)`
+
+    Обрабатывает GET-запросы:
+
+    - Ищет по строке `q` (необязательно — только в проекте `project`) и возвращает страницу `page` размером
+    `page_size` результатов, отсортированных по релевантности. Ссылка на следующую страницу передается в заголовке
+    `Link`.
+    - Если параметры невалидны, возвращает ошибки валидации со статусом 400 Bad Request.
+    """
+    serializer_class = SearchSerializer
+    query_budget = {'GET': 1}
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(data=[{'errors': serializer.errors}], status=400)
+        page, page_size = serializer.validated_data['page'], serializer.validated_data['page_size']
+        results = search(
+            serializer.validated_data['q'],
+            project_id=serializer.validated_data.get('project'),
+            limit=page_size + 1,
+            offset=(page - 1) * page_size,
+        )
+        headers = {}
+        if len(results) > page_size:
+            headers['Link'] = f'<{replace_query_param(request.build_absolute_uri(), "page", page + 1)}>; rel="next"'
+        return Response(
+            data=SearchResultSerializer(results[:page_size], many=True, context={'request': request}).data,
+            status=200,
+            headers=headers,
+        )
+
+
+class ChangesView(ListAPIView):
+    """
+    `ChangesView` — представление на основе `ListAPIView`, предоставляющее ленту изменений проектов, задач,
+    участников и комментариев для синхронизации клиентов.
+
+    Атрибуты класса
+
+    - serializer_class: `ChangeFeedSerializer` — сериализатор параметров ленты.
+    - query_budget: `{'GET': 6}` — бюджет SQL-запросов по методам HTTP.
+
+    Методы класса
+
+    `get(request, *args, **kwargs)`
+
+    Обрабатывает GET-запросы:
+
+    - Возвращает записи журнала изменений после курсора `cursor` (необязательно — только проекта `project`), не
+    больше `page_size`. Несколько изменений одного объекта сворачиваются в одно, с текущим состоянием объекта в
+    `data`; для удалённых объектов `data` равно `null`.
+    - Курсор для следующего запроса передается в заголовке `X-Next-Cursor`, а при наличии следующей страницы —
+    ещё и в `Link`. Без изменений курсор остаётся прежним.
+    - Если записи после курсора уже удалены из журнала (`prune_change_log`), возвращает 410 Gone: клиенту нужно
+    заново загрузить данные полностью.
+    - Если параметры невалидны, возвращает ошибки валидации со статусом 400 Bad Request.
+    """
+    serializer_class = ChangeFeedSerializer
+    query_budget = {'GET': 6}
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(data=[{'errors': serializer.errors}], status=400)
+        cursor = serializer.validated_data['cursor']
+        if is_expired(cursor):
+            return Response(
+                data=[{'errors': {'cursor': ['Курсор устарел, нужна полная синхронизация']}}],
+                status=410,
+            )
+
+        changes, has_more = get_changes(
+            cursor,
+            project_id=serializer.validated_data.get('project'),
+            limit=serializer.validated_data['page_size'],
+        )
+        latest = {}
+        for change in changes:
+            latest.pop((change.kind, change.object_id), None)
+            latest[change.kind, change.object_id] = change
+        context = {'request': request}
+        context['objects'] = ChangeSerializer.load_objects(latest.values(), context)
+
+        next_cursor = str(changes[-1].id if changes else cursor)
+        headers = {'X-Next-Cursor': next_cursor}
+        if has_more:
+            link = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+            headers['Link'] = f'<{link}>; rel="next"'
+        return Response(
+            data=ChangeSerializer(latest.values(), many=True, context=context).data,
+            status=200,
+            headers=headers,
+        )
+
+
+class DatabasePoolView(APIView):
+    """
+    `DatabasePoolView` — представление на основе `APIView`, предоставляющее состояние пула подключений к базе.
+
+    Атрибуты класса
+
+    - permission_classes: `[IsAdminUser]` — доступ только для администраторов.
+
+    Методы класса
+
+    `get(request)`
+
+    Обрабатывает GET-запросы:
+
+    - Возвращает для каждой базы размер пула, число свободных подключений и ожидающих запросов и счётчики
+    `psycopg_pool` (`get_pool_stats`). Пул у каждого процесса свой, поэтому данные относятся к процессу,
+    обработавшему запрос.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(data=get_pool_stats(), status=200)
@@ -1,14 +1,132 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
 import json
 
+from task_traker.notifications import get_project_group_name
+from .metrics import metrics
+
+
+class CoalescingWebsocketConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket-потребитель с ограниченной очередью исходящих сообщений.
+
+    События не отправляются по одному: они копятся в очереди соединения и раз в `WEBSOCKET_COALESCE_WINDOW` секунд
+    уходят одним JSON-кадром (`get_frame`, `encode_frame`). События с одинаковым ключом схлопываются (`merge`),
+    поэтому пачка одинаковых уведомлений или изменений одной задачи занимает в очереди одно место. Если очередь
+    переполнена (`WEBSOCKET_QUEUE_SIZE`) или кадр не уходит за `WEBSOCKET_SEND_TIMEOUT` секунд, клиент считается
+    медленным, и соединение закрывается с кодом `slow_consumer_code`, а не копит память.
+
+    Соединения, события, кадры, глубина очереди соединения и задержка доставки (от `group_send` до отправки кадра)
+    учитываются в `websoket.metrics` под меткой `metrics_label`.
+    """
+    slow_consumer_code = 4008
+    metrics_label = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = {}
+        self.sent_at = []
+        self.flush_task = None
+        self.connected = False
+
+    @staticmethod
+    def merge(previous, payload):
+        return payload
+
+    def get_frame(self, payloads):
+        """Данные кадра из накопленных событий: по умолчанию — их список; подклассы оборачивают его своими полями."""
+        return payloads
+
+    def encode_frame(self, payloads):
+        return json.dumps(self.get_frame(payloads))
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        self.connected = True
+        metrics.incr('connects')
+        metrics.adjust(f'connections:{self.metrics_label}', 1)
+        await self.flush_metrics()
+
+    async def enqueue(self, key, payload, sent_at=None):
+        metrics.incr('events_received')
+        if sent_at is not None:
+            self.sent_at.append(sent_at)
+        if key in self.pending:
+            metrics.incr('events_coalesced')
+            payload = self.merge(self.pending.pop(key), payload)
+        self.pending[key] = payload
+        metrics.observe('queue_depth', len(self.pending))
+        if len(self.pending) > settings.WEBSOCKET_QUEUE_SIZE:
+            await self.close_slow_consumer()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        while self.pending:
+            await asyncio.sleep(settings.WEBSOCKET_COALESCE_WINDOW)
+            payloads, self.pending = list(self.pending.values()), {}
+            sent_at, self.sent_at = self.sent_at, []
+            try:
+                await asyncio.wait_for(
+                    self.send(text_data=self.encode_frame(payloads)),
+                    settings.WEBSOCKET_SEND_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                self.flush_task = None
+                await self.close_slow_consumer()
+                return
+            self.record_frame(payloads, sent_at)
+            await self.flush_metrics()
+        self.flush_task = None
+
+    @staticmethod
+    def record_frame(payloads, sent_at):
+        now = time.time()
+        metrics.incr('frames_sent')
+        metrics.incr('events_sent', len(payloads))
+        metrics.observe('frame_events', len(payloads))
+        for i in sent_at:
+            metrics.observe('delivery_ms', (now - i) * 1000)
+
+    @staticmethod
+    async def flush_metrics():
+        if metrics.is_due():
+            await sync_to_async(metrics.flush, thread_sensitive=False)()
+
+    async def close_slow_consumer(self):
+        metrics.incr('slow_consumer_closes')
+        self.pending, self.sent_at = {}, []
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.close(code=self.slow_consumer_code)
+
+    async def websocket_disconnect(self, message):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if self.connected:
+            self.connected = False
+            metrics.incr('disconnects')
+            metrics.adjust(f'connections:{self.metrics_label}', -1)
+            await self.flush_metrics()
+        await super().websocket_disconnect(message)
+
+
+class NotificationConsumer(CoalescingWebsocketConsumer):
     """
     Асинхронный WebSocket-потребитель для отправки уведомлений.
 
-    Этот потребитель обрабатывает подключение, отключение и получение сообщений от WebSocket-клиентов.
-    Он использует группы каналов для рассылки уведомлений всем подключенным клиентам.
+    Этот потребитель обрабатывает подключение и отключение WebSocket-клиентов и рассылает уведомления группы
+    пользователя. Уведомления, пришедшие за одно окно, отправляются одним кадром: одно — как `{"message": ...}`,
+    несколько — как `{"messages": [...]}`; одинаковые уведомления схлопываются. Сообщения клиентов не
+    пересылаются в группу.
     """
+    metrics_label = 'notification'
 
     async def websocket_connect(self, event):
         self.room_name = self.scope['url_route']['kwargs']['pk']
@@ -27,21 +145,76 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
-    async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message = text_data_json['message']
+    async def receive(self, text_data=None, bytes_data=None):
+        pass
+
+    async def notification_message(self, event):
+        await self.enqueue(event['message'], event['message'], event.get('sent_at'))
+
+    def get_frame(self, payloads):
+        if len(payloads) == 1:
+            return {'message': payloads[0]}
+        return {'messages': payloads}
+
+
+class ProjectConsumer(CoalescingWebsocketConsumer):
+    """
+    Асинхронный WebSocket-потребитель для подписки на задачи проекта.
+
+    Все клиенты, открывшие доску проекта, получают события создания, изменения и удаления его задач
+    (`task_traker.notifications.send_task_event`, для массовых операций — `send_task_events`) и могут не
+    опрашивать `TaskProjectView`. События одной задачи за окно схлопываются в одно, и кадр содержит список
+    `events`. Канал только для чтения: сообщения клиентов игнорируются.
+    """
+    metrics_label = 'project'
+
+    async def websocket_connect(self, event):
+        self.project_id = self.scope['url_route']['kwargs']['pk']
+        self.room_group_name = get_project_group_name(self.project_id)
+
+        await self.channel_layer.group_add(
+            self.room_group_name,
+            self.channel_name
+        )
+
+        await self.accept()
 
-        await self.channel_layer.group_send(
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(
             self.room_group_name,
+            self.channel_name
+        )
+
+    async def receive(self, text_data=None, bytes_data=None):
+        pass
+
+    async def task_event(self, event):
+        await self.enqueue(
+            event['task'],
             {
-                'type': 'notification.message',
-                'message': message,
-            }
+                'event': f'task.{event["action"]}',
+                'task': event['task'],
+                'data': event['data'],
+            },
+            event.get('sent_at'),
         )
 
-    async def notification_message(self, event):
-        message = event['message']
+    async def task_events(self, event):
+        # Массовая операция приходит одним сообщением; в очереди её задачи схлопываются как отдельные события.
+        sent_at = event.get('sent_at')
+        for task in event['tasks']:
+            await self.task_event({'action': event['action'], **task, 'sent_at': sent_at})
+            sent_at = None
+
+    @staticmethod
+    def merge(previous, payload):
+        # Изменение после создания или изменения дополняет прежние данные; удаление заменяет всё.
+        if payload['event'] != 'task.updated' or previous['event'] == 'task.deleted':
+            return payload
+        return {**previous, 'data': {**(previous['data'] or {}), **(payload['data'] or {})}}
 
-        await self.send(text_data=json.dumps({
-            'message': message
-        }))
+    def get_frame(self, payloads):
+        return {
+            'project': int(self.project_id),
+            'events': payloads,
+        }
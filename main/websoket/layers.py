@@ -0,0 +1,250 @@
+import asyncio
+import datetime
+import json
+import logging
+import time
+import uuid
+import weakref
+from base64 import b64decode, b64encode
+
+from channels.db import database_sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.db import transaction
+from django.db.models import Count
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class MessageEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, bytes):
+            return {'__bytes__': b64encode(o).decode()}
+        return super().default(o)
+
+
+def decode_bytes(obj):
+    if set(obj) == {'__bytes__'}:
+        return b64decode(obj['__bytes__'])
+    return obj
+
+
+class LoopState:
+    def __init__(self):
+        self.receive_buffer = {}
+        self.waiters = {}
+        self.poll_task = None
+
+
+class DatabaseChannelLayer(BaseChannelLayer):
+    """
+    Слой каналов поверх основной базы данных проекта: группы и сообщения хранятся в таблицах `websoket`,
+    поэтому их видят все ASGI-процессы, подключённые к этой базе, без Redis или другого брокера.
+
+    Как и в `channels_redis`, у сообщений есть срок жизни (`expiry`), у участия в группах — `group_expiry`, а
+    у каналов — ограничение на число ожидающих сообщений (`capacity`, `channel_capacity`). Каждый процесс
+    опрашивает базу одной фоновой задачей на все каналы, которые сейчас ждут сообщений; пока сообщений нет,
+    интервал опроса растёт от `poll_interval` до `max_poll_interval`.
+    """
+    extensions = ['groups', 'flush']
+
+    def __init__(
+        self,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.02,
+        max_poll_interval=0.25,
+        receive_batch_size=500,
+        cleanup_interval=30,
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, **kwargs)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.receive_batch_size = receive_batch_size
+        self.cleanup_interval = cleanup_interval
+        self.client_prefix = uuid.uuid4().hex
+        self.last_cleanup = datetime.datetime.min
+        self.loops = weakref.WeakKeyDictionary()
+
+    def get_loop_state(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self.loops:
+            self.loops[loop] = LoopState()
+        return self.loops[loop]
+
+    @staticmethod
+    def encode(message):
+        return json.dumps(message, cls=MessageEncoder)
+
+    @staticmethod
+    def decode(message):
+        return json.loads(message, object_hook=decode_bytes)
+
+    def get_expires(self, seconds):
+        return datetime.datetime.today() + datetime.timedelta(seconds=seconds)
+
+    # Синхронные операции с базой данных
+
+    def _send_many(self, channels, message):
+        from .models import ChannelMessage
+
+        now = datetime.datetime.today()
+        queued = dict(
+            ChannelMessage.objects.filter(
+                channel__in=channels,
+                expires__gte=now,
+            ).order_by().values_list('channel').annotate(value=Count('id'))
+        )
+        accepted = [i for i in channels if queued.get(i, 0) < self.get_capacity(i)]
+        ChannelMessage.objects.bulk_create(
+            [
+                ChannelMessage(channel=i, message=message, expires=self.get_expires(self.expiry)) for i in accepted
+            ]
+        )
+        return accepted
+
+    def _receive_many(self, channels):
+        from .models import ChannelMessage
+
+        self._clean_expired()
+        with transaction.atomic():
+            rows = list(
+                ChannelMessage.objects.select_for_update(skip_locked=True).filter(
+                    channel__in=channels,
+                    expires__gte=datetime.datetime.today(),
+                ).order_by('id').values_list('id', 'channel', 'message')[:self.receive_batch_size]
+            )
+            ChannelMessage.objects.filter(pk__in=[i[0] for i in rows]).delete()
+        return [(channel, message) for _, channel, message in rows]
+
+    def _clean_expired(self):
+        from .models import ChannelMessage, GroupMembership
+
+        now = datetime.datetime.today()
+        if (now - self.last_cleanup).total_seconds() < self.cleanup_interval:
+            return
+        self.last_cleanup = now
+        expired = ChannelMessage.objects.filter(expires__lt=now)
+        GroupMembership.objects.filter(channel__in=expired.values('channel')).delete()
+        expired.delete()
+        GroupMembership.objects.filter(expires__lt=now).delete()
+
+    def _group_add(self, group, channel):
+        from .models import GroupMembership
+
+        GroupMembership.objects.update_or_create(
+            group=group,
+            channel=channel,
+            defaults={'expires': self.get_expires(self.group_expiry)},
+        )
+
+    def _group_discard(self, group, channel):
+        from .models import GroupMembership
+
+        GroupMembership.objects.filter(group=group, channel=channel).delete()
+
+    def _group_channels(self, group):
+        from .models import GroupMembership
+
+        return list(
+            GroupMembership.objects.filter(
+                group=group,
+                expires__gte=datetime.datetime.today(),
+            ).values_list('channel', flat=True)
+        )
+
+    def _flush(self):
+        from .models import ChannelMessage, GroupMembership
+
+        ChannelMessage.objects.all().delete()
+        GroupMembership.objects.all().delete()
+
+    def run(self, function, *args):
+        return database_sync_to_async(function, thread_sensitive=False)(*args)
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        assert '__asgi_channel__' not in message
+
+        if not await self.run(self._send_many, [channel], self.encode(message)):
+            metrics.incr('channel_full')
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+
+        state = self.get_loop_state()
+        queue = state.receive_buffer.setdefault(channel, asyncio.Queue())
+        state.waiters[channel] = state.waiters.get(channel, 0) + 1
+        if state.poll_task is None or state.poll_task.done():
+            state.poll_task = asyncio.create_task(self.poll(state))
+        try:
+            return await queue.get()
+        finally:
+            state.waiters[channel] -= 1
+            if not state.waiters[channel]:
+                del state.waiters[channel]
+                if queue.empty():
+                    state.receive_buffer.pop(channel, None)
+
+    async def poll(self, state):
+        interval = self.poll_interval
+        while state.receive_buffer:
+            try:
+                messages = await self.run(self._receive_many, list(state.receive_buffer))
+            except Exception as error:
+                logger.warning('Не удалось получить сообщения слоя каналов из базы данных: %s', error)
+                messages = []
+            for channel, message in messages:
+                queue = state.receive_buffer.get(channel)
+                if queue is not None:
+                    queue.put_nowait(self.decode(message))
+            interval = self.poll_interval if messages else min(interval * 2, self.max_poll_interval)
+            await asyncio.sleep(interval)
+
+    async def new_channel(self, prefix='specific'):
+        return f'{prefix}.{self.client_prefix}!{uuid.uuid4().hex}'
+
+    async def flush(self):
+        await self.run(self._flush)
+
+    async def close(self):
+        for state in list(self.loops.values()):
+            if state.poll_task is not None:
+                state.poll_task.cancel()
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), 'Group name not valid'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        await self.run(self._group_add, group, channel)
+
+    async def group_discard(self, group, channel):
+        assert self.valid_channel_name(channel), 'Invalid channel name'
+        assert self.valid_group_name(group), 'Invalid group name'
+        await self.run(self._group_discard, group, channel)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        assert self.valid_group_name(group), 'Invalid group name'
+
+        started = time.monotonic()
+        channels = await self.run(self._group_channels, group)
+        if channels:
+            accepted = await self.run(self._send_many, channels, self.encode(message))
+            metrics.incr('channel_full', len(channels) - len(accepted))
+        metrics.incr('group_sends')
+        metrics.incr('group_send_channels', len(channels))
+        metrics.observe('group_send_ms', (time.monotonic() - started) * 1000)
+        if metrics.is_due():
+            await self.run(metrics.flush)
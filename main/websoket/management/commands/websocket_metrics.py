@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from websoket.metrics import get_metrics
+
+RATES = ('connects', 'events_received', 'events_sent', 'frames_sent', 'group_sends')
+
+
+def get_percentile(histogram, percentile):
+    """Верхняя граница корзины, в которую попадает перцентиль."""
+    count = histogram['count']
+    for bucket, value in histogram['buckets'].items():
+        if count and value >= count * percentile / 100:
+            return bucket
+    return '-'
+
+
+class Command(BaseCommand):
+    help = ('Выводит сводку метрик WebSocket-соединений всех ASGI-процессов: соединения, скорость событий и кадров, '
+            'глубину очередей соединений, задержку доставки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5, help='Интервал между замерами, секунды')
+        parser.add_argument('--loop', action='store_true', help='Выводить сводку непрерывно')
+
+    def handle(self, *args, **options):
+        previous = get_metrics()
+        while True:
+            time.sleep(options['interval'])
+            current = get_metrics()
+            self.write_summary(previous, current, options['interval'])
+            if not options['loop']:
+                return
+            previous = current
+
+    def write_summary(self, previous, current, interval):
+        connections = ', '.join(f'{name}: {value}' for name, value in current['connections'].items())
+        self.stdout.write(f'Соединения — {connections}')
+        rates = ', '.join(
+            f'{name}: {(current["counters"][name] - previous["counters"][name]) / interval:.1f}/с' for name in RATES
+        )
+        self.stdout.write(f'Скорость — {rates}')
+        counters = current['counters']
+        self.stdout.write(
+            f'Схлопнуто событий: {counters["events_coalesced"]}, медленных клиентов закрыто: '
+            f'{counters["slow_consumer_closes"]}, переполнений каналов: {counters["channel_full"]}'
+        )
+        for name, histogram in current['histograms'].items():
+            self.stdout.write(
+                f'{name}: среднее {histogram["avg"]}, p50 ≤ {get_percentile(histogram, 50)}, '
+                f'p95 ≤ {get_percentile(histogram, 95)}, p99 ≤ {get_percentile(histogram, 99)} '
+                f'(замеров: {histogram["count"]})'
+            )
+        if current['layer'] is not None:
+            layer = current['layer']
+            self.stdout.write(
+                f'Слой каналов — групп: {layer["groups"]}, участников: {layer["group_memberships"]}, '
+                f'сообщений в очереди: {layer["queued_messages"]}'
+            )
@@ -0,0 +1,218 @@
+import atexit
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F, Sum
+
+from .models import ChannelMessage, GroupMembership, MetricCounter, MetricGauge
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    'connects',
+    'disconnects',
+    'slow_consumer_closes',
+    'events_received',
+    'events_coalesced',
+    'events_sent',
+    'frames_sent',
+    'group_sends',
+    'group_send_channels',
+    'channel_full',
+)
+CONSUMERS = ('notification', 'project')
+# Границы корзин гистограмм: миллисекунды для задержек, число событий для кадров.
+HISTOGRAMS = {
+    'delivery_ms': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    'group_send_ms': (1, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'frame_events': (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'queue_depth': (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+}
+
+
+class Metrics:
+    """
+    Метрики WebSocket-соединений одного процесса.
+
+    Счётчики копятся в памяти и раз в `WEBSOCKET_METRICS_FLUSH_INTERVAL` секунд прибавляются к общим значениям в
+    таблице `MetricCounter`, чтобы горячий путь отправки сообщений не обращался к базе на каждое событие. Таблица
+    общая для всех ASGI-процессов (как и у `DatabaseChannelLayer`), поэтому эндпоинт и команда `websocket_metrics`
+    видят сумму по всем процессам. Кроме сброса по ходу работы (`is_due`) накопленное раз в интервал сбрасывает
+    фоновый поток (`start`), даже если новых событий нет, и ещё раз — выход процесса.
+    `WEBSOCKET_METRICS_FLUSH_THREAD=False` отключает фоновый поток.
+    Число открытых соединений (`connections:<потребитель>`) — не счётчик, а текущее значение процесса (`adjust`):
+    каждый сброс записывает его в `MetricGauge` со сроком `WEBSOCKET_METRICS_GAUGE_TTL` секунд, а в сумму входят
+    только строки с неистёкшим сроком. Поэтому соединения упавшего процесса перестают учитываться сами, а не
+    остаются в общей сумме навсегда.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.gauges = Counter()
+        self.gauges_pid = os.getpid()
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.pid = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Фоновый сброс для текущего процесса; после `fork` поток запускается заново."""
+        if self.pid == os.getpid() or not settings.WEBSOCKET_METRICS_FLUSH_THREAD:
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='websocket-metrics', daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        while not self.stopped.wait(settings.WEBSOCKET_METRICS_FLUSH_INTERVAL):
+            self.safe_flush()
+            # Соединения потока сброса не нужны до следующего интервала.
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.safe_flush()
+        try:
+            MetricGauge.objects.filter(process=self.process).delete()
+        except DatabaseError as error:
+            # Строки процесса всё равно перестанут учитываться, когда истечёт их срок.
+            logger.debug('Не удалось удалить показатели WebSocket процесса: %s', error)
+
+    @property
+    def process(self):
+        return f'{socket.gethostname()}:{os.getpid()}:{id(self)}'[:100]
+
+    def safe_flush(self):
+        try:
+            self.flush()
+        except DatabaseError as error:
+            logger.warning('Не удалось сохранить метрики WebSocket в базе данных: %s', error)
+
+    def incr(self, name, value=1):
+        self.start()
+        with self.lock:
+            self.counters[name] += value
+
+    def adjust(self, name, value):
+        self.start()
+        with self.lock:
+            if self.gauges_pid != os.getpid():
+                # Соединения родительского процесса после `fork` к дочернему не относятся.
+                self.gauges, self.gauges_pid = Counter(), os.getpid()
+            self.gauges[name] += value
+
+    def observe(self, name, value):
+        self.start()
+        bucket = next((i for i in HISTOGRAMS[name] if value <= i), 'inf')
+        with self.lock:
+            self.counters[f'{name}:{bucket}'] += 1
+            self.counters[f'{name}:sum'] += round(value)
+            self.counters[f'{name}:count'] += 1
+
+    def is_due(self):
+        return time.monotonic() - self.last_flush >= settings.WEBSOCKET_METRICS_FLUSH_INTERVAL
+
+    def flush(self):
+        with self.lock:
+            counters, self.counters = self.counters, Counter()
+            gauges = dict(self.gauges) if self.gauges_pid == os.getpid() else {}
+            self.last_flush = time.monotonic()
+        if gauges:
+            self.flush_gauges(gauges)
+        if not counters:
+            return
+        # Недостающие строки создаются с нулём, а прибавление идёт через `F`, поэтому процессы не теряют чужие
+        # приращения. Если база недоступна, приращения возвращаются и уйдут со следующим сбросом.
+        try:
+            with transaction.atomic():
+                MetricCounter.objects.bulk_create([MetricCounter(name=i) for i in counters], ignore_conflicts=True)
+                for name, value in counters.items():
+                    if value:
+                        MetricCounter.objects.filter(name=name).update(value=F('value') + value)
+        except DatabaseError:
+            with self.lock:
+                self.counters.update(counters)
+            raise
+
+    def flush_gauges(self, gauges):
+        """Записывает текущие значения процесса с новым сроком и удаляет строки, срок которых истёк."""
+        now = datetime.datetime.today()
+        expires = now + datetime.timedelta(seconds=settings.WEBSOCKET_METRICS_GAUGE_TTL)
+        with transaction.atomic():
+            MetricGauge.objects.bulk_create(
+                [MetricGauge(process=self.process, name=name, value=value, expires=expires)
+                 for name, value in gauges.items()],
+                update_conflicts=True,
+                unique_fields=['process', 'name'],
+                update_fields=['value', 'expires'],
+            )
+            MetricGauge.objects.filter(expires__lt=now).delete()
+
+
+metrics = Metrics()
+
+
+def get_histogram(values, name):
+    buckets = {}
+    total = 0
+    for bucket in (*HISTOGRAMS[name], 'inf'):
+        total += values.get(f'{name}:{bucket}', 0)
+        buckets[str(bucket)] = total
+    count = values.get(f'{name}:count', 0)
+    return {
+        'buckets': buckets,
+        'count': count,
+        'sum': values.get(f'{name}:sum', 0),
+        'avg': round(values.get(f'{name}:sum', 0) / count, 2) if count else 0,
+    }
+
+
+def get_layer_stats():
+    """Группы и очередь сообщений `DatabaseChannelLayer`; для других слоёв каналов — `None`."""
+    from channels.layers import get_channel_layer
+
+    from .layers import DatabaseChannelLayer
+
+    if not isinstance(get_channel_layer(), DatabaseChannelLayer):
+        return None
+    return {
+        'groups': GroupMembership.objects.order_by().values('group').distinct().count(),
+        'group_memberships': GroupMembership.objects.count(),
+        'queued_messages': ChannelMessage.objects.count(),
+    }
+
+
+def get_metrics():
+    """Общие метрики всех процессов: счётчики, открытые соединения, гистограммы и состояние слоя каналов."""
+    metrics.flush()
+    names = list(COUNTERS)
+    for name, buckets in HISTOGRAMS.items():
+        names += [f'{name}:{i}' for i in (*buckets, 'inf', 'sum', 'count')]
+    values = dict(MetricCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    gauges = dict(
+        MetricGauge.objects
+        .filter(name__in=[f'connections:{i}' for i in CONSUMERS], expires__gte=datetime.datetime.today())
+        .order_by()
+        .values('name')
+        .annotate(total=Sum('value'))
+        .values_list('name', 'total')
+    )
+    return {
+        'connections': {i: gauges.get(f'connections:{i}', 0) for i in CONSUMERS},
+        'counters': {name: values.get(name, 0) for name in COUNTERS},
+        'histograms': {name: get_histogram(values, name) for name in HISTOGRAMS},
+        'layer': get_layer_stats(),
+    }
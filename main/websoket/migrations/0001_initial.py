@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:11
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(max_length=100)),
+                ('message', models.TextField()),
+                ('expires', models.DateTimeField(default=datetime.datetime.today)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['channel', 'id'], name='channel_message_channel_idx'), models.Index(fields=['expires'], name='channel_message_expires_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=100)),
+                ('channel', models.CharField(max_length=100)),
+                ('expires', models.DateTimeField(default=datetime.datetime.today)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires'], name='group_membership_expires_idx')],
+                'constraints': [models.UniqueConstraint(fields=('group', 'channel'), name='group_membership_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:08
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('websoket', '0002_metric_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricGauge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('process', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('value', models.BigIntegerField(default=0)),
+                ('expires', models.DateTimeField(default=datetime.datetime.today)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires'], name='metric_gauge_expires_idx')],
+                'constraints': [models.UniqueConstraint(fields=('process', 'name'), name='metric_gauge_unique')],
+            },
+        ),
+    ]
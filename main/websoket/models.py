@@ -1,3 +1,64 @@
+import datetime
+
 from django.db import models
 
-# Create your models here.
+
+class ChannelMessage(models.Model):
+    """
+    Сообщение, ожидающее получения в канале `DatabaseChannelLayer`.
+    """
+    channel = models.CharField(max_length=100)
+    message = models.TextField()
+    expires = models.DateTimeField(default=datetime.datetime.today)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['channel', 'id'], name='channel_message_channel_idx'),
+            models.Index(fields=['expires'], name='channel_message_expires_idx'),
+        ]
+
+
+class GroupMembership(models.Model):
+    """
+    Участие канала в группе `DatabaseChannelLayer`.
+    """
+    group = models.CharField(max_length=100)
+    channel = models.CharField(max_length=100)
+    expires = models.DateTimeField(default=datetime.datetime.today)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'channel'], name='group_membership_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['expires'], name='group_membership_expires_idx'),
+        ]
+
+
+class MetricCounter(models.Model):
+    """
+    Общее значение счётчика `websoket.metrics`: процессы прибавляют к нему накопленное раз в
+    `WEBSOCKET_METRICS_FLUSH_INTERVAL` секунд.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+
+class MetricGauge(models.Model):
+    """
+    Текущее значение показателя `websoket.metrics` (например, числа открытых соединений) в одном процессе.
+    Процесс обновляет строку при каждом сбросе метрик; строки процессов, которые перестали её обновлять, считаются
+    устаревшими после `expires` и в сумму не входят.
+    """
+    process = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+    value = models.BigIntegerField(default=0)
+    expires = models.DateTimeField(default=datetime.datetime.today)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['process', 'name'], name='metric_gauge_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['expires'], name='metric_gauge_expires_idx'),
+        ]
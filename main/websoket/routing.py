@@ -5,4 +5,5 @@ from django.urls import re_path
 
 websocket_urlpatterns = [
     re_path(r"ws/msg/(?P<pk>\d+)/$", consumers.NotificationConsumer.as_asgi()),
+    re_path(r"ws/projects/(?P<pk>\d+)/$", consumers.ProjectConsumer.as_asgi()),
 ]
@@ -1,3 +1,185 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import time
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from .consumers import CoalescingWebsocketConsumer, NotificationConsumer, ProjectConsumer
+from .metrics import Metrics, get_metrics, metrics
+
+from .layers import DatabaseChannelLayer
+from .models import ChannelMessage, GroupMembership, MetricCounter, MetricGauge
+
+
+@override_settings(WEBSOCKET_METRICS_FLUSH_THREAD=False)
+class DatabaseChannelLayerTests(TransactionTestCase):
+    def setUp(self):
+        self.layer = DatabaseChannelLayer(capacity=2)
+
+    def test_send_receive(self):
+        async def run():
+            channel = await self.layer.new_channel()
+            await self.layer.send(channel, {'type': 'test.message', 'text': 'hello', 'data': b'\x00'})
+            return await asyncio.wait_for(self.layer.receive(channel), 5)
+
+        message = async_to_sync(run)()
+        self.assertEqual(message, {'type': 'test.message', 'text': 'hello', 'data': b'\x00'})
+        self.assertFalse(ChannelMessage.objects.exists())
+
+    def test_group_send_between_layers(self):
+        other = DatabaseChannelLayer()
+
+        async def run():
+            first, second = await self.layer.new_channel(), await other.new_channel()
+            await self.layer.group_add('notification_1', first)
+            await other.group_add('notification_1', second)
+            await other.group_send('notification_1', {'type': 'notification.message', 'message': 'hi'})
+            return await asyncio.wait_for(
+                asyncio.gather(self.layer.receive(first), other.receive(second)),
+                5,
+            )
+
+        self.assertEqual([i['message'] for i in async_to_sync(run)()], ['hi', 'hi'])
+        async_to_sync(self.layer.flush)()
+        self.assertFalse(GroupMembership.objects.exists())
+
+    def test_capacity(self):
+        async def run():
+            channel = await self.layer.new_channel()
+            for _ in range(3):
+                await self.layer.send(channel, {'type': 'test.message'})
+
+        with self.assertRaises(ChannelFull):
+            async_to_sync(run)()
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    WEBSOCKET_QUEUE_SIZE=3,
+    WEBSOCKET_METRICS_FLUSH_THREAD=False,
+)
+class CoalescingConsumerTests(TransactionTestCase):
+    def connect(self, consumer, path, pk):
+        return ApplicationCommunicator(
+            consumer.as_asgi(),
+            {'type': 'websocket', 'path': path, 'url_route': {'args': (), 'kwargs': {'pk': pk}}},
+        )
+
+    def test_project_events_coalesced(self):
+        async def run():
+            communicator = self.connect(ProjectConsumer, '/ws/projects/1/', '1')
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await communicator.receive_output(5))['type'], 'websocket.accept')
+            channel_layer = get_channel_layer()
+            for event in (
+                {'action': 'created', 'task': 1, 'data': {'title': 'Task', 'status': 'in_progress'}, 'sent_at': time.time()},
+                {'action': 'updated', 'task': 1, 'data': {'status': 'done'}},
+                {'action': 'updated', 'task': 2, 'data': {'status': 'done'}},
+            ):
+                await channel_layer.group_send('project_1', {'type': 'task.event', **event})
+            frame = json.loads((await communicator.receive_output(5))['text'])
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(5)
+            return frame
+
+        before = get_metrics()
+        frame = async_to_sync(run)()
+        after = get_metrics()
+        self.assertEqual(frame['events'], [
+            {'event': 'task.created', 'task': 1, 'data': {'title': 'Task', 'status': 'done'}},
+            {'event': 'task.updated', 'task': 2, 'data': {'status': 'done'}},
+        ])
+        self.assertEqual(after['connections'], before['connections'])
+        for name, value in (('connects', 1), ('events_received', 3), ('events_coalesced', 1), ('frames_sent', 1)):
+            self.assertEqual(after['counters'][name] - before['counters'][name], value)
+        self.assertEqual(after['histograms']['delivery_ms']['count'] - before['histograms']['delivery_ms']['count'], 1)
+        self.assertEqual(after['histograms']['queue_depth']['count'] - before['histograms']['queue_depth']['count'], 3)
+        self.assertIsNone(after['layer'])
+
+    def test_metrics_shared_between_processes(self):
+        metrics.flush()
+        MetricCounter.objects.all().delete()
+        other = Metrics()
+        other.incr('connects', 2)
+        other.adjust('connections:project', 1)
+        other.observe('queue_depth', 7)
+        other.flush()
+        metrics.incr('connects')
+        current = get_metrics()
+        self.assertEqual(current['counters']['connects'], 3)
+        self.assertEqual(current['connections']['project'], 1)
+        self.assertEqual(current['histograms']['queue_depth']['buckets']['10'], 1)
+        self.assertEqual(MetricCounter.objects.get(name='connects').value, 3)
+
+    def test_connections_of_dead_process_expire(self):
+        metrics.flush()
+        live, dead = Metrics(), Metrics()
+        live.adjust('connections:project', 2)
+        dead.adjust('connections:project', 3)
+        live.flush()
+        dead.flush()
+        self.assertEqual(get_metrics()['connections']['project'], 5)
+        # Процесс упал, не отключив соединения: его строка больше не обновляется, и срок истекает.
+        MetricGauge.objects.filter(process=dead.process).update(
+            expires=datetime.datetime.today() - datetime.timedelta(seconds=1),
+        )
+        self.assertEqual(get_metrics()['connections']['project'], 2)
+        live.adjust('connections:project', -2)
+        live.flush()
+        self.assertEqual(get_metrics()['connections']['project'], 0)
+        self.assertFalse(MetricGauge.objects.filter(process=dead.process).exists())
+        live.stop()
+        self.assertFalse(MetricGauge.objects.filter(process=live.process).exists())
+
+    @override_settings(WEBSOCKET_METRICS_FLUSH_THREAD=True, WEBSOCKET_METRICS_FLUSH_INTERVAL=0.05)
+    def test_metrics_flushed_by_thread(self):
+        other = Metrics()
+        other.incr('disconnects')
+        # Пока поток пишет в базу, SQLite не даёт её читать, поэтому ждём опустевших счётчиков и остановки потока.
+        for _ in range(100):
+            if not other.counters:
+                break
+            time.sleep(0.05)
+        other.stopped.set()
+        other.thread.join(5)
+        self.assertEqual(MetricCounter.objects.get(name='disconnects').value, 1)
+
+    def test_bulk_project_events(self):
+        async def run():
+            communicator = self.connect(ProjectConsumer, '/ws/projects/1/', '1')
+            await communicator.send_input({'type': 'websocket.connect'})
+            await communicator.receive_output(5)
+            await get_channel_layer().group_send('project_1', {
+                'type': 'task.events',
+                'action': 'updated',
+                'tasks': [{'task': n, 'data': {'status': 'done'}} for n in (1, 2)],
+            })
+            frame = json.loads((await communicator.receive_output(5))['text'])
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(5)
+            return frame
+
+        self.assertEqual(async_to_sync(run)()['events'], [
+            {'event': 'task.updated', 'task': n, 'data': {'status': 'done'}} for n in (1, 2)
+        ])
+
+    def test_default_frame(self):
+        consumer = CoalescingWebsocketConsumer()
+        self.assertEqual(json.loads(consumer.encode_frame([{'event': 1}, {'event': 2}])), [{'event': 1}, {'event': 2}])
+
+    def test_slow_consumer_closed(self):
+        async def run():
+            communicator = self.connect(NotificationConsumer, '/ws/msg/1/', '1')
+            await communicator.send_input({'type': 'websocket.connect'})
+            await communicator.receive_output(5)
+            channel_layer = get_channel_layer()
+            for n in range(5):
+                await channel_layer.group_send('notification_1', {'type': 'notification.message', 'message': n})
+            return await communicator.receive_output(5)
+
+        self.assertEqual(async_to_sync(run)(), {'type': 'websocket.close', 'code': 4008})
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('ws/metrics', views.MetricsView.as_view(), name='websocket_metrics'),
+]
@@ -1,3 +1,29 @@
-from django.shortcuts import render
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .metrics import get_metrics
+
+
+class MetricsView(APIView):
+    """
+    `MetricsView` — представление на основе `APIView`, предоставляющее метрики WebSocket-соединений.
+
+    Атрибуты класса
+
+    - permission_classes: `[IsAdminUser]` — доступ только для администраторов.
+
+    Методы класса
+
+    `get(request)`
+
+    Обрабатывает GET-запросы:
+
+    - Возвращает сумму по всем ASGI-процессам: число открытых соединений по потребителям, счётчики событий и кадров,
+    гистограммы задержки доставки, времени `group_send`, размера кадров и глубины очереди соединений, а для
+    `DatabaseChannelLayer` — число групп и сообщений в очереди.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(data=get_metrics(), status=200)